@@ -0,0 +1,204 @@
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from collections import deque, namedtuple
+
+from bitboard import BitBoard
+from engine import TetrisEngine, LEFT, RIGHT, ROTATE, SOFT_DROP, EVENT_LOCK
+from pieces import get_piece, rotated
+
+# 自动玩家：对当前方块枚举所有可达的 (旋转, 列) 落点（规则与 move_piece / rotate_piece / check_collision 一致），
+# 用可配置的启发式（消行数、总高度、空洞、凹凸度）给落点后的棋盘打分，再把走法作为普通输入动作交给引擎。
+# 批量评估器在进程池中并行跑大量带种子的对局，用于调整启发式权重
+
+Weights = namedtuple('Weights', ['lines', 'height', 'holes', 'bumpiness'])
+DEFAULT_WEIGHTS = Weights(0.76, -0.51, -0.36, -0.18)
+
+Placement = namedtuple('Placement', ['rotation', 'x', 'y', 'actions', 'score'])
+
+
+def collides(rows, cols, piece, px, py):
+    # 与 BitBoard.collides 相同的规则，直接作用于行掩码列表
+    if px + piece.min_x < 0 or px + piece.max_x >= cols:
+        return True
+    if py + piece.height >= len(rows):
+        return True
+    for dy, mask in enumerate(piece.row_masks):
+        if rows[py + dy + 1] & (mask << px):
+            return True
+    return False
+
+
+def reachable(rows, cols, piece, x, y):
+    # 在当前高度上广度优先搜索所有可达的 (旋转, 列)，返回 {(rotation, x): 动作列表}
+    start = (piece.rotation, x)
+    paths = {start: []}
+    queue = deque([(piece, x)])
+    while queue:
+        state, px = queue.popleft()
+        path = paths[(state.rotation, px)]
+        moves = []
+        for dx, action in ((-1, LEFT), (1, RIGHT)):
+            if not collides(rows, cols, state, px + dx, y):
+                moves.append((state, px + dx, action))
+        new_state = rotated(state)
+        for offset in new_state.kicks:
+            if not collides(rows, cols, new_state, px + offset, y):
+                moves.append((new_state, px + offset, ROTATE))
+                break
+        for next_state, nx, action in moves:
+            key = (next_state.rotation, nx)
+            if key not in paths:
+                paths[key] = path + [action]
+                queue.append((next_state, nx))
+    return paths
+
+
+def place(rows, cols, piece, x, y):
+    # 合并并消行，返回 (新棋盘, 消除行数)
+    rows = list(rows)
+    for dy, mask in enumerate(piece.row_masks):
+        rows[y + dy] |= mask << x
+    full = (1 << cols) - 1
+    kept = [row for row in rows if row != full]
+    lines = len(rows) - len(kept)
+    return [0] * lines + kept, lines
+
+
+def features(rows, cols):
+    # 返回 (总高度, 空洞数, 凹凸度)
+    heights = [0] * cols
+    seen = 0
+    holes = 0
+    for y, row in enumerate(rows):
+        new = row & ~seen
+        while new:
+            bit = new & -new
+            heights[bit.bit_length() - 1] = len(rows) - y
+            new ^= bit
+        seen |= row
+        holes += bin(seen & ~row).count('1')
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(cols - 1))
+    return sum(heights), holes, bumpiness
+
+
+def evaluate(rows, cols, lines, weights):
+    height, holes, bumpiness = features(rows, cols)
+    return (weights.lines * lines + weights.height * height +
+            weights.holes * holes + weights.bumpiness * bumpiness)
+
+
+def search(engine, weights=DEFAULT_WEIGHTS):
+    # 返回 (最佳落点, 评估的落点数)
+    piece = engine.piece
+    if piece is None:
+        return None, 0
+    board = engine.board
+    rows = board.occupancy()
+    y = int(engine.current_y)
+    best = None
+    candidates = reachable(rows, board.cols, piece, engine.current_x, y)
+    for (rotation, x), actions in candidates.items():
+        state = get_piece(piece.shape_id, rotation)
+        land_y = board.landing_row(state, x, y)
+        new_rows, lines = place(rows, board.cols, state, x, land_y)
+        score = evaluate(new_rows, board.cols, lines, weights)
+        if best is None or score > best.score:
+            best = Placement(rotation, x, land_y, actions, score)
+    return best, len(candidates)
+
+
+class AutoPlayer:
+    def __init__(self, weights=DEFAULT_WEIGHTS):
+        self.weights = weights
+        self.planned_version = None
+        self.placements = 0  # 已评估的落点数
+
+    def next_actions(self, engine):
+        # 每出一个新方块（board_version 变化）规划一次，返回应送入 step() 的动作
+        if engine.piece is None or engine.board_version == self.planned_version:
+            return []
+        self.planned_version = engine.board_version
+        best, evaluated = search(engine, self.weights)
+        self.placements += evaluated
+        if best is None:
+            return []
+        return best.actions + [SOFT_DROP]
+
+
+def play_game(seed, weights=DEFAULT_WEIGHTS, max_pieces=500, dt=1.0):
+    # 无窗口跑一局，返回 (分数, 方块数, 评估的落点数)
+    engine = TetrisEngine(board=BitBoard(), rng=random.Random(seed))
+    engine.spawn_new_piece()
+    player = AutoPlayer(weights)
+    pieces = 0
+    while not engine.game_over and pieces < max_pieces:
+        events = engine.step(player.next_actions(engine), dt)
+        pieces += sum(1 for event in events if event[0] == EVENT_LOCK)
+    return engine.score, pieces, player.placements
+
+
+def _play_chunk(args):
+    seeds, weights, max_pieces = args
+    return [play_game(seed, weights, max_pieces) for seed in seeds]
+
+
+def evaluate_weights(weights, seeds, workers=None, max_pieces=500, chunk_size=8):
+    # 在进程池中并行评估一组权重，返回平均分和吞吐指标
+    workers = workers or os.cpu_count() or 1
+    chunks = [(seeds[i:i + chunk_size], weights, max_pieces) for i in range(0, len(seeds), chunk_size)]
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        for chunk in chunks:
+            results.extend(_play_chunk(chunk))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(_play_chunk, chunks):
+                results.extend(chunk_results)
+    elapsed = time.perf_counter() - start
+    return {
+        'weights': weights,
+        'mean_score': sum(r[0] for r in results) / len(results),
+        'mean_pieces': sum(r[1] for r in results) / len(results),
+        'games_per_sec': len(results) / elapsed,
+        'placements_per_sec': sum(r[2] for r in results) / elapsed,
+        'workers': workers,
+    }
+
+
+def tune(candidates=20, games=64, workers=None, seed=0, max_pieces=500):
+    # 在默认权重附近随机搜索，所有候选使用同一组对局种子以便公平比较
+    rng = random.Random(seed)
+    seeds = list(range(seed * 1000003, seed * 1000003 + games))
+    best = evaluate_weights(DEFAULT_WEIGHTS, seeds, workers, max_pieces)
+    print(format_result(best))
+    for _ in range(candidates):
+        weights = Weights(*(w * rng.uniform(0.5, 1.5) for w in best['weights']))
+        result = evaluate_weights(weights, seeds, workers, max_pieces)
+        print(format_result(result))
+        if result['mean_score'] > best['mean_score']:
+            best = result
+    return best
+
+
+def format_result(result):
+    weights = ', '.join(f'{w:.3f}' for w in result['weights'])
+    return (f"权重 ({weights})  平均分 {result['mean_score']:.1f}  平均方块 {result['mean_pieces']:.1f}  "
+            f"{result['games_per_sec']:.1f} 局/秒  {result['placements_per_sec']:,.0f} 落点/秒  "
+            f"({result['workers']} 进程)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='自动玩家批量评估与权重调整')
+    parser.add_argument('--games', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pieces', type=int, default=500)
+    parser.add_argument('--tune', type=int, default=0, help='随机搜索的候选权重数')
+    args = parser.parse_args()
+    if args.tune:
+        tune(args.tune, args.games, args.workers, max_pieces=args.max_pieces)
+    else:
+        print(format_result(evaluate_weights(DEFAULT_WEIGHTS, list(range(args.games)), args.workers, args.max_pieces)))
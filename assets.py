@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+
+import pygame
+
+# 资源管理：资源目录只解析一次（打包后为 sys._MEIPASS），图片在后台线程解码，开始菜单先用占位图显示，
+# 解码完成后投递 ASSET_LOADED 事件唤醒主循环；主线程取用时转换为显示格式，并缓存当前窗口尺寸的缩放版本。
+# 缺失或损坏的文件写入 error.log 并以占位图/静音代替，不再中止启动
+
+ASSET_LOADED = pygame.event.custom_type()
+IMAGES = ('background.jpg',)
+PLACEHOLDER_SIZE = (300, 600)
+PLACEHOLDER_COLOR = (40, 24, 56)
+
+
+def resource_base():
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+BASE_PATH = resource_base()
+
+
+def asset_path(name):
+    return os.path.join(BASE_PATH, name)
+
+
+def log_error(error_log, message):
+    # 打印并追加到 error.log（error_log 为已打开的文件，None 时只打印）
+    print(message)
+    if error_log is not None:
+        error_log.write(message)
+        error_log.flush()
+
+
+def asset_error(error, name):
+    path = asset_path(name)
+    return f'[ASSET ERROR] {error}\n文件: {path}\n文件存在: {os.path.exists(path)}\n'
+
+
+def display_format(surface, alpha=False):
+    # 转换为显示格式以加快 blit；纹理渲染后端没有 display 表面（表面只用来上传纹理），保持原格式
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class AssetManager:
+    def __init__(self, images=IMAGES, error_log=None):
+        self.error_log = error_log
+        self.lock = threading.Lock()
+        self.decoded = {}  # 后台线程写入：name -> 解码后的 Surface 或异常
+        self.images = {}   # 主线程：name -> 显示格式的 Surface（失败时为占位图）
+        self.scaled_cache = {}  # name -> (尺寸, 版本, 缩放后的 Surface)，只保留当前窗口尺寸
+        self.version = 0   # 每有一张图片就绪加一，渲染层据此重建缓存
+        self.placeholder_surface = None
+        self.thread = threading.Thread(target=self._decode, args=(images,), daemon=True)
+        self.thread.start()
+
+    def _decode(self, names):
+        for name in names:
+            try:
+                result = pygame.image.load(asset_path(name))
+            except Exception as e:
+                result = e
+            with self.lock:
+                self.decoded[name] = result
+            pygame.event.post(pygame.event.Event(ASSET_LOADED, name=name))
+
+    def collect(self):
+        # 在主线程把已解码的图片转换为显示格式
+        with self.lock:
+            decoded, self.decoded = self.decoded, {}
+        for name, result in decoded.items():
+            if isinstance(result, Exception):
+                log_error(self.error_log, asset_error(result, name))
+                result = self.placeholder()
+            else:
+                result = display_format(result, alpha=bool(result.get_flags() & pygame.SRCALPHA))
+            self.images[name] = result
+            self.version += 1
+
+    def wait(self, timeout=None):
+        # 等待后台解码结束（基准测试、离线渲染等需要最终图像的场合）
+        self.thread.join(timeout)
+        self.collect()
+
+    def image(self, name):
+        # 已就绪返回显示格式的图片，否则返回占位图
+        surface = self.images.get(name)
+        if surface is None:
+            self.collect()
+            surface = self.images.get(name)
+        return surface if surface is not None else self.placeholder()
+
+    def scaled(self, name, size):
+        cached = self.scaled_cache.get(name)
+        if cached is not None and cached[0] == size and cached[1] == self.version:
+            return cached[2]
+        source = self.image(name)
+        surface = source if source.get_size() == size else pygame.transform.scale(source, size)
+        self.scaled_cache[name] = (size, self.version, surface)
+        return surface
+
+    def placeholder(self):
+        if self.placeholder_surface is None:
+            self.placeholder_surface = display_format(pygame.Surface(PLACEHOLDER_SIZE))
+            self.placeholder_surface.fill(PLACEHOLDER_COLOR)
+        return self.placeholder_surface
+
+    def sound(self, name):
+        # 音效同步加载，失败时返回静音的占位音效
+        try:
+            return pygame.mixer.Sound(asset_path(name))
+        except Exception as e:
+            log_error(self.error_log, asset_error(e, name))
+            return pygame.mixer.Sound(buffer=bytes(64))
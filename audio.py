@@ -0,0 +1,154 @@
+import math
+import os
+from array import array
+from collections import OrderedDict
+
+import pygame
+
+from assets import asset_path, asset_error, log_error
+from engine import EVENT_ROTATE, EVENT_LOCK, EVENT_CLEAR, EVENT_GAME_OVER
+
+# 音频：背景音乐通过 pygame.mixer.music 流式播放（不整首解码进内存），暂停/继续从原位置接着放，
+# 音量与 bg_volume 滑条同步。短音效启动时预加载到有容量上限的缓存，在保留的声道池上播放，
+# Channel.play 立即返回，不阻塞游戏循环。音效文件缺失时用合成的短音代替；没有音频设备时整个系统静默。
+# 构造时不碰音频设备：混音器初始化、音效预加载放在 open() 里，由游戏在第一帧上屏之后调用，不计入启动时间；
+# open() 之前系统静默（导出、基准测试不调用 open()）
+
+# 事件 -> (音效文件, 缺失时合成音的频率 Hz, 时长 s)
+EFFECTS = {
+    EVENT_ROTATE: ('rotate.wav', 660, 0.05),
+    EVENT_LOCK: ('lock.wav', 220, 0.08),
+    EVENT_CLEAR: ('clear.wav', 880, 0.25),
+    EVENT_GAME_OVER: ('game_over.wav', 110, 0.6),
+}
+EFFECT_CHANNELS = 4              # 为音效保留的声道数
+EFFECT_CACHE_BYTES = 2 * 1024 * 1024
+EFFECT_VOLUME = 0.6
+
+
+def synth_tone(frequency, duration, volume=0.3):
+    # 按混音器格式生成带线性衰减的正弦短音，只支持 16 位有符号样本
+    rate, size, channels = pygame.mixer.get_init()
+    count = int(rate * duration)
+    if size != -16:
+        return pygame.mixer.Sound(buffer=bytes(count * channels * abs(size) // 8))
+    amplitude = volume * 32767
+    step = 2 * math.pi * frequency / rate
+    sin = math.sin
+    mono = array('h', [int(amplitude * (1 - i / count) * sin(step * i)) for i in range(count)])
+    samples = array('h', bytes(2 * count * channels))
+    for channel in range(channels):
+        samples[channel::channels] = mono
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+
+def sound_bytes(sound):
+    rate, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * rate) * channels * abs(size) // 8
+
+
+class SoundCache:
+    # 按字节数限制容量的 LRU 音效缓存
+    def __init__(self, max_bytes=EFFECT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sounds = OrderedDict()
+
+    def get(self, key):
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.sounds.move_to_end(key)
+        return sound
+
+    def put(self, key, sound):
+        if key in self.sounds:
+            self.size -= sound_bytes(self.sounds.pop(key))
+        self.sounds[key] = sound
+        self.size += sound_bytes(sound)
+        while self.size > self.max_bytes and len(self.sounds) > 1:
+            _, old = self.sounds.popitem(last=False)
+            self.size -= sound_bytes(old)
+
+
+class AudioSystem:
+    def __init__(self, assets, volume=0.5, error_log=None):
+        self.assets = assets
+        self.error_log = error_log
+        self.volume = volume
+        self.music_loaded = False
+        self.music_paused = False
+        self.effects = None
+        self.channels = []
+        self.next_channel = 0
+
+    def open(self):
+        if self.enabled:
+            return
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            log_error(self.error_log, f'[AUDIO ERROR] {e}\n音频设备不可用，静音运行\n')
+            return
+        pygame.mixer.set_reserved(EFFECT_CHANNELS)
+        self.channels = [pygame.mixer.Channel(i) for i in range(EFFECT_CHANNELS)]
+        self.effects = SoundCache()
+        for event in EFFECTS:
+            self.load_effect(event)
+
+    @property
+    def enabled(self):
+        return self.effects is not None
+
+    def load_effect(self, event):
+        name, frequency, duration = EFFECTS[event]
+        if os.path.exists(asset_path(name)):
+            sound = self.assets.sound(name)
+        else:
+            sound = synth_tone(frequency, duration)
+        sound.set_volume(EFFECT_VOLUME)
+        self.effects.put(event, sound)
+        return sound
+
+    def play_music(self, name='bg_music.mp3'):
+        if not self.enabled:
+            return
+        try:
+            pygame.mixer.music.load(asset_path(name))
+        except pygame.error as e:
+            log_error(self.error_log, asset_error(e, name))
+            return
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(-1)
+        self.music_loaded = True
+        self.music_paused = False
+
+    def set_music_playing(self, playing):
+        # 暂停后继续时从暂停的位置接着播放
+        if not self.music_loaded:
+            return
+        if playing and self.music_paused:
+            pygame.mixer.music.unpause()
+        elif not playing and not self.music_paused:
+            pygame.mixer.music.pause()
+        self.music_paused = not playing
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.music_loaded:
+            pygame.mixer.music.set_volume(volume)
+
+    def play_effect(self, event):
+        # 轮流使用保留声道，全部占用时打断最早开始的那一个
+        if not self.enabled:
+            return
+        sound = self.effects.get(event) or self.load_effect(event)
+        channel = self.channels[self.next_channel]
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+        channel.play(sound)
+
+    def handle_events(self, events):
+        # engine.step() 返回的事件驱动音效
+        for event in events:
+            if event[0] in EFFECTS:
+                self.play_effect(event[0])
@@ -0,0 +1,225 @@
+import random
+import sys
+import time
+
+import numpy as np
+
+from engine import (TetrisEngine, COLS, ROWS, COLORS, DEFAULT_DROP_SPEED, SOFT_DROP_SPEED, LINE_SCORE,
+                    ACTIONS, ACTION_CODES, LEFT, RIGHT, ROTATE, SOFT_DROP, SOFT_DROP_RELEASE, HARD_DROP)
+from pieces import PIECES, NUM_ROTATIONS, KICK_OFFSETS
+
+# 批量模拟器：N 个棋盘存放在形状为 (N, ROWS, COLS) 的 NumPy 数组中（0 为空格，其余为颜色序号+1），
+# 移动、旋转、下落、碰撞、固定和消行对所有棋盘一次性向量化计算，规则与 engine.TetrisEngine 完全一致。
+# 出块仍按棋盘各自的 random.Random 抽取（与标量引擎抽取顺序相同），只在方块固定的棋盘上执行，
+# 因此同一种子下两种引擎的结果逐步一致，见 differential_check()
+
+# step() 的动作编码与 engine.ACTIONS 相同，0 表示无操作
+NOOP = 0
+
+# 方块查找表：[shape_id, rotation, cell] -> 偏移，VALID 标记有效格（各形状格数不同）
+MAX_CELLS = max(len(state.offsets) for states in PIECES for state in states)
+OFFSET_X = np.zeros((len(PIECES), NUM_ROTATIONS, MAX_CELLS), dtype=np.int64)
+OFFSET_Y = np.zeros((len(PIECES), NUM_ROTATIONS, MAX_CELLS), dtype=np.int64)
+VALID = np.zeros((len(PIECES), NUM_ROTATIONS, MAX_CELLS), dtype=bool)
+WIDTH = np.zeros(len(PIECES), dtype=np.int64)
+for _states in PIECES:
+    for _state in _states:
+        for _i, (_dx, _dy) in enumerate(_state.offsets):
+            OFFSET_X[_state.shape_id, _state.rotation, _i] = _dx
+            OFFSET_Y[_state.shape_id, _state.rotation, _i] = _dy
+            VALID[_state.shape_id, _state.rotation, _i] = True
+    WIDTH[_states[0].shape_id] = _states[0].width
+
+
+class BatchEngine:
+    def __init__(self, n, seeds=None, cols=COLS, rows=ROWS):
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        if seeds is None:
+            seeds = range(n)
+        self.rngs = [random.Random(seed) for seed in seeds]
+        self.cells = np.zeros((n, rows, cols), dtype=np.uint8)
+        self.shape = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.float64)
+        self.color = np.zeros(n, dtype=np.uint8)
+        self.drop_speed = np.full(n, DEFAULT_DROP_SPEED)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.spawn(np.arange(n))
+
+    def collides(self, idx, shape, rotation, x, y):
+        # 与 Board.collides 语义一致：idx 为棋盘下标数组，其余参数为同长度数组
+        cx = x[:, None] + OFFSET_X[shape, rotation]
+        cy = y[:, None] + OFFSET_Y[shape, rotation]
+        hit = (cy >= self.rows - 1) | (cx < 0) | (cx >= self.cols)
+        below = self.cells[idx[:, None], np.clip(cy + 1, 0, self.rows - 1), np.clip(cx, 0, self.cols - 1)]
+        hit |= below != 0
+        return (hit & VALID[shape, rotation]).any(axis=1)
+
+    def collides_at(self, idx, x=None, rotation=None):
+        if x is None:
+            x = self.x[idx]
+        if rotation is None:
+            rotation = self.rotation[idx]
+        return self.collides(idx, self.shape[idx], rotation, x, self.y[idx].astype(np.int64))
+
+    def spawn(self, idx):
+        # 按各棋盘自己的随机源出块，抽取顺序与 TetrisEngine.spawn_new_piece 相同
+        for i in idx:
+            rng = self.rngs[i]
+            self.shape[i] = rng.randrange(len(PIECES))
+            self.color[i] = COLORS.index(rng.choice(COLORS)) + 1
+        self.rotation[idx] = 0
+        self.x[idx] = self.cols // 2 - WIDTH[self.shape[idx]] // 2
+        self.y[idx] = 0
+        self.game_over[idx] |= self.collides_at(idx)
+
+    def move(self, idx, dx):
+        if not len(idx):
+            return
+        ok = ~self.collides_at(idx, x=self.x[idx] + dx)
+        self.x[idx[ok]] += dx
+
+    def rotate(self, idx):
+        # 依次尝试踢墙偏移，先成功的偏移生效
+        new_rotation = (self.rotation[idx] + 1) % NUM_ROTATIONS
+        for offset in KICK_OFFSETS:
+            if not len(idx):
+                return
+            ok = ~self.collides_at(idx, x=self.x[idx] + offset, rotation=new_rotation)
+            done = idx[ok]
+            self.rotation[done] = new_rotation[ok]
+            self.x[done] += offset
+            idx = idx[~ok]
+            new_rotation = new_rotation[~ok]
+
+    def hard_drop(self, idx):
+        # 逐行下移直到全部着陆，与 TetrisEngine.hard_drop 相同
+        while len(idx):
+            idx = idx[~self.collides_at(idx)]
+            self.y[idx] = np.floor(self.y[idx]) + 1
+
+    def apply_actions(self, actions):
+        actions = np.asarray(actions)
+        live = ~self.game_over
+        self.move(np.flatnonzero(live & (actions == ACTION_CODES[LEFT])), -1)
+        self.move(np.flatnonzero(live & (actions == ACTION_CODES[RIGHT])), 1)
+        self.rotate(np.flatnonzero(live & (actions == ACTION_CODES[ROTATE])))
+        self.drop_speed[live & (actions == ACTION_CODES[SOFT_DROP])] = SOFT_DROP_SPEED
+        self.drop_speed[live & (actions == ACTION_CODES[SOFT_DROP_RELEASE])] = DEFAULT_DROP_SPEED
+        self.hard_drop(np.flatnonzero(live & (actions == ACTION_CODES[HARD_DROP])))
+
+    def merge(self, idx):
+        shape = self.shape[idx]
+        rotation = self.rotation[idx]
+        cx = self.x[idx][:, None] + OFFSET_X[shape, rotation]
+        cy = self.y[idx].astype(np.int64)[:, None] + OFFSET_Y[shape, rotation]
+        valid = VALID[shape, rotation]
+        # 越界的棋盘不合并，直接结束
+        outside = ((cy < 0) | (cy >= self.rows) | (cx < 0) | (cx >= self.cols)) & valid
+        bad = outside.any(axis=1)
+        self.game_over[idx[bad]] = True
+        keep = ~bad
+        rows, cells = np.nonzero(valid & keep[:, None])
+        board = idx[rows]
+        self.cells[board, cy[rows, cells], cx[rows, cells]] = self.color[board]
+        return idx[keep]
+
+    def clear_lines(self, idx):
+        # 满行移到顶部并清空，其余行保持原顺序下移
+        full = (self.cells[idx] != 0).all(axis=2)
+        counts = full.sum(axis=1)
+        has = counts > 0
+        if has.any():
+            idx = idx[has]
+            full = full[has]
+            order = np.argsort(~full, axis=1, kind='stable')
+            boards = np.take_along_axis(self.cells[idx], order[:, :, None], axis=1)
+            boards[np.arange(self.rows)[None, :] < counts[has][:, None]] = 0
+            self.cells[idx] = boards
+            self.score[idx] += counts[has] * LINE_SCORE
+        return counts
+
+    def update(self, dt):
+        live = np.flatnonzero(~self.game_over)
+        landed = self.collides_at(live)
+        falling = live[~landed]
+        y = self.y[falling]
+        self.y[falling] = np.minimum(y + self.drop_speed[falling] * dt, np.floor(y) + 1)
+        locked = self.merge(live[landed])
+        lines = np.zeros(self.n, dtype=np.int64)
+        if len(locked):
+            lines[locked] = self.clear_lines(locked)
+            self.spawn(locked)
+        return lines
+
+    def step(self, actions=None, dt=0.0):
+        # actions 为长度 N 的动作编码数组；返回本步各棋盘消除的行数
+        if actions is not None:
+            self.apply_actions(actions)
+        return self.update(dt)
+
+    def board_state(self, i):
+        # 单个棋盘的 (分数, x, y, 形状, 旋转, 是否结束, 已固定格) ，用于与标量引擎比较
+        ys, xs = np.nonzero(self.cells[i])
+        cells = sorted((int(x), int(y), COLORS[self.cells[i, y, x] - 1]) for x, y in zip(xs, ys))
+        return (int(self.score[i]), int(self.x[i]), float(self.y[i]),
+                int(self.shape[i]), int(self.rotation[i]), bool(self.game_over[i]), cells)
+
+
+def scalar_state(engine):
+    piece = engine.piece
+    shape, rotation = (piece.shape_id, piece.rotation) if piece is not None else (None, None)
+    return (engine.score, engine.current_x, float(engine.current_y),
+            shape, rotation, engine.game_over, sorted(engine.board.iter_cells()))
+
+
+def differential_check(n=64, steps=3000, seed=0, dt=0.1):
+    # 随机输入下逐步比较批量引擎与标量引擎，返回第一个不一致的 (步数, 棋盘) 或 None
+    seeds = [seed * 100003 + i for i in range(n)]
+    batch = BatchEngine(n, seeds)
+    engines = [TetrisEngine(rng=random.Random(s)) for s in seeds]
+    for engine in engines:
+        engine.spawn_new_piece()
+    inputs = np.random.default_rng(seed)
+    for t in range(steps):
+        actions = inputs.integers(0, len(ACTIONS), n)
+        batch.step(actions, dt)
+        for i, engine in enumerate(engines):
+            action = ACTIONS[actions[i]]
+            engine.step([action] if action else [], dt)
+            expected = scalar_state(engine)
+            got = batch.board_state(i)
+            if engine.game_over:
+                # 结束时标量引擎丢弃了当前方块，只比较分数、状态和棋盘
+                expected = (expected[0], expected[5], expected[6])
+                got = (got[0], got[5], got[6])
+                if engine.game_over != batch.game_over[i]:
+                    return t, i
+            if expected != got:
+                return t, i
+        if batch.game_over.all():
+            break
+    return None
+
+
+def benchmark(n=4096, steps=500, dt=1.0 / 60):
+    batch = BatchEngine(n)
+    inputs = np.random.default_rng(0)
+    actions = inputs.integers(0, len(ACTIONS), (steps, n))
+    start = time.perf_counter()
+    for t in range(steps):
+        batch.step(actions[t], dt)
+    elapsed = time.perf_counter() - start
+    return n * steps / elapsed
+
+
+if __name__ == '__main__':
+    if '--check' in sys.argv:
+        for seed in range(5):
+            mismatch = differential_check(seed=seed)
+            print(f'seed {seed}: ' + ('一致' if mismatch is None else f'第 {mismatch[0]} 步棋盘 {mismatch[1]} 不一致'))
+    print(f'{benchmark():,.0f} 棋盘步/秒')
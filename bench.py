@@ -0,0 +1,240 @@
+import os
+
+# 基准测试默认在无窗口、无声卡环境下运行
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import copy
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from bitboard import BitBoard
+from engine import TetrisEngine, Board, COLORS, COLS, ROWS
+from pieces import build_state
+from renderer import RENDER_BACKENDS
+
+# 基准测试：引擎热点（check_collision / ghost_y / rotate_piece / merge_to_grid / clear_lines，不同填充率、两种棋盘后端）
+# 以及各 game_state 在不同窗口尺寸、游戏中在不同棋盘尺寸下的 render()（--renderer 选择渲染后端）。输出 p50/p95/p99、每帧新增的 Python 内存块数（render() 前后两次 tracemalloc 快照之差）和每帧堆内存峰值增量（KiB），
+# 结果保存为 JSON，可与另一次提交的结果比较并标出变慢的项目
+#
+#   python bench.py --out new.json
+#   python bench.py --out new.json --compare old.json
+
+# 单格方块，用于直接在棋盘上摆放已固定的格子
+DOT = build_state(0, 0, ((1,),))
+
+BACKENDS = {'list': Board, 'bitboard': BitBoard}
+FILL_LEVELS = (0.0, 0.25, 0.5, 0.75)
+RENDER_STATES = ('start_menu', 'playing', 'paused', 'game_over')
+WINDOW_SIZES = ((300, 600), (600, 900), (1280, 1024))
+BOARD_SIZES = ((10, 20), (10, 2000), (40, 2000))
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+def filled_engine(board_cls, fill, seed=0, cols=COLS, rows=ROWS):
+    # 底部 fill 比例的行随机填满，每行留一个空位，保证不会被消掉
+    rng = random.Random(seed)
+    engine = TetrisEngine(board=board_cls(cols, rows), seed=seed)
+    board = engine.board
+    for y in range(board.rows - int(board.rows * fill), board.rows):
+        hole = rng.randrange(board.cols)
+        for x in range(board.cols):
+            if x != hole and rng.random() < 0.8:
+                board.merge(DOT, x, y, rng.choice(COLORS))
+    engine.spawn_new_piece()
+    return engine
+
+
+def bench_calls(fn, samples=200, batch=50):
+    # 每个样本连续调用 batch 次，返回单次调用耗时（微秒）的分位数
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        times.append((time.perf_counter() - start) / batch * 1e6)
+    return percentiles(times)
+
+
+def bench_with_setup(setup, fn, samples=500):
+    # 每次调用前执行不计时的 setup（恢复棋盘），返回单次调用耗时（微秒）的分位数
+    times = []
+    for _ in range(samples):
+        state = setup()
+        start = time.perf_counter()
+        fn(state)
+        times.append((time.perf_counter() - start) * 1e6)
+    return percentiles(times)
+
+
+def run_micro():
+    results = {}
+    for backend, board_cls in BACKENDS.items():
+        cases = [(fill, COLS, ROWS, f'{backend}/fill{int(fill * 100)}') for fill in FILL_LEVELS]
+        cases += [(0.5, cols, rows, f'{backend}/{cols}x{rows}') for cols, rows in BOARD_SIZES[1:]]
+        for fill, cols, rows, tag in cases:
+            engine = filled_engine(board_cls, fill, cols=cols, rows=rows)
+            samples = 500 if rows == ROWS else 50  # 大棋盘每个样本都要复制整个棋盘，减少样本数
+            results[f'check_collision/{tag}'] = bench_calls(engine.check_collision)
+            results[f'ghost_y/{tag}'] = bench_calls(engine.ghost_y)
+            results[f'rotate_piece/{tag}'] = bench_calls(engine.rotate_piece)
+
+            def fresh_engine():
+                clone = copy.deepcopy(engine)
+                clone.current_y = 0
+                return clone
+            results[f'merge_to_grid/{tag}'] = bench_with_setup(fresh_engine, lambda e: e.merge_to_grid(), samples)
+
+            def full_rows_engine():
+                # 在底部补满 4 行，测一次消四行的代价（与 update() 一样只检查这 4 行）
+                clone = copy.deepcopy(engine)
+                board = clone.board
+                occupancy = board.occupancy()
+                for y in range(board.rows - 4, board.rows):
+                    for x in range(board.cols):
+                        if not occupancy[y] >> x & 1:
+                            board.merge(DOT, x, y, COLORS[0])
+                return clone
+            results[f'clear_lines/{tag}'] = bench_with_setup(full_rows_engine, lambda e: e.clear_lines(range(e.board.rows - 4, e.board.rows)), samples)
+    return results
+
+
+def make_game(backend='surface', driver=None):
+    from Games import TetrisGame
+    game = TetrisGame(render_backend=backend, render_driver=driver)
+    game.assets.wait()
+    return game
+
+
+def resize(game, size):
+    # 渲染器在下一次绘制时按新的窗口尺寸重新布局
+    game.renderer.resize(size)
+
+
+def run_render(frames=300, backend='surface', driver=None):
+    game = make_game(backend, driver)
+    results = {}
+    for size in WINDOW_SIZES:
+        for state in RENDER_STATES:
+            game.reset_game()
+            game.engine = filled_engine(Board, 0.5)
+            game.game_state = state
+            resize(game, size)
+            game.render()  # 预热缓存
+            times = []
+            peaks = []
+            allocs = []
+            tracemalloc.start()
+            for i in range(frames):
+                if state == 'playing':
+                    game.engine.step([], 1.0 / 60)
+                before = tracemalloc.take_snapshot()
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter()
+                game.render()
+                times.append((time.perf_counter() - start) * 1e3)
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+                after = tracemalloc.take_snapshot()
+                allocs.append(sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno')))
+            tracemalloc.stop()
+            result = percentiles(times)
+            result['peak_kb_per_frame'] = sum(peaks) / len(peaks) / 1024
+            result['allocs_per_frame'] = sum(allocs) / len(allocs)
+            results[f'{state}@{size[0]}x{size[1]}'] = result
+    return results
+
+
+def run_boards(frames=300, backend='surface', driver=None):
+    # 游戏中的帧时间应与棋盘总行数无关（只绘制视口内的行）
+    game = make_game(backend, driver)
+    resize(game, WINDOW_SIZES[0])
+    results = {}
+    for cols, rows in BOARD_SIZES:
+        game.reset_game()
+        game.engine = filled_engine(Board, 0.5, cols=cols, rows=rows)
+        game.game_state = 'playing'
+        game.render()
+        times = []
+        for i in range(frames):
+            game.engine.step([], 1.0 / 60)
+            start = time.perf_counter()
+            game.render()
+            times.append((time.perf_counter() - start) * 1e3)
+        results[f'playing/{cols}x{rows}'] = percentiles(times)
+    return results
+
+
+def meta(renderer):
+    import pygame
+    info = {'python': platform.python_version(), 'pygame': pygame.version.ver,
+            'machine': platform.machine(), 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'renderer': renderer}
+    try:
+        import subprocess
+        info['commit'] = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                                 cwd=os.path.dirname(os.path.abspath(__file__)),
+                                                 stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        pass
+    return info
+
+
+def compare(old, new, threshold):
+    # 返回 p50 变慢超过 threshold 比例的项目
+    regressions = []
+    for section in ('micro', 'render', 'board'):
+        for name, result in new.get(section, {}).items():
+            base = old.get(section, {}).get(name)
+            if base and result['p50'] > base['p50'] * (1 + threshold):
+                regressions.append((f'{section}/{name}', base['p50'], result['p50']))
+    return regressions
+
+
+def print_results(results):
+    for name, r in results['micro'].items():
+        print(f'{name:40s} p50 {r["p50"]:8.2f}us  p95 {r["p95"]:8.2f}us  p99 {r["p99"]:8.2f}us')
+    for name, r in results['render'].items():
+        print(f'{name:40s} p50 {r["p50"]:8.3f}ms  p95 {r["p95"]:8.3f}ms  p99 {r["p99"]:8.3f}ms  '
+              f'{r["allocs_per_frame"]:7.1f} 次分配/帧  峰值 {r["peak_kb_per_frame"]:6.1f} KiB/帧')
+    for name, r in results['board'].items():
+        print(f'{name:40s} p50 {r["p50"]:8.3f}ms  p95 {r["p95"]:8.3f}ms  p99 {r["p99"]:8.3f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='引擎与渲染基准测试')
+    parser.add_argument('--out', help='结果 JSON 输出路径')
+    parser.add_argument('--compare', help='与之比较的基准结果 JSON')
+    parser.add_argument('--threshold', type=float, default=0.10, help='判定为变慢的 p50 增幅比例')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--skip-render', action='store_true')
+    parser.add_argument('--renderer', choices=RENDER_BACKENDS, default='surface', help='渲染后端')
+    parser.add_argument('--render-driver', help='纹理后端使用的 SDL 渲染驱动，如 software')
+    args = parser.parse_args()
+
+    render_args = (args.frames, args.renderer, args.render_driver)
+    results = {'meta': meta(args.renderer), 'micro': run_micro(),
+               'render': {} if args.skip_render else run_render(*render_args),
+               'board': {} if args.skip_render else run_boards(*render_args)}
+    print_results(results)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        regressions = compare(old, results, args.threshold)
+        for name, before, after in regressions:
+            print(f'变慢: {name}  {before:.3f} -> {after:.3f} (+{(after / before - 1) * 100:.0f}%)')
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,94 @@
+from engine import COLS, ROWS, HeightIndex, without_rows
+
+# 位棋盘后端：每行存为一个整数位掩码（第 x 位代表第 x 列），颜色单独存放在紧凑的 bytearray 中
+# 与 engine.Board 接口一致，可直接传给 TetrisEngine(board=BitBoard())
+# 方块的行掩码在 pieces.PIECES 中预先计算好；列高度/行填充数索引的维护方式与 engine.Board 相同
+
+
+class BitBoard(HeightIndex):
+    def __init__(self, cols=COLS, rows=ROWS):
+        self.cols = cols
+        self.rows = rows
+        self.palette = []         # 颜色索引 -> 颜色元组
+        self.palette_index = {}   # 颜色元组 -> 颜色索引+1（0 表示空格）
+        self.reset()
+
+    def reset(self):
+        self.row_bits = [0] * self.rows
+        self.colors = [bytearray(self.cols) for _ in range(self.rows)]
+        self.heights = [0] * self.cols
+        self.row_fill = [0] * self.rows
+
+    def color_id(self, color):
+        idx = self.palette_index.get(color)
+        if idx is None:
+            self.palette.append(color)
+            idx = self.palette_index[color] = len(self.palette)
+        return idx
+
+    def collides(self, piece, px, py):
+        # 与 Board.collides 语义一致：检查方块下方一格是否被占用或越界
+        masks = piece.row_masks
+        if px + piece.min_x < 0 or px + piece.max_x >= self.cols:
+            return True
+        if py + len(masks) >= self.rows:
+            return True
+        row_bits = self.row_bits
+        for y, mask in enumerate(masks):
+            if row_bits[py + y + 1] & (mask << px):
+                return True
+        return False
+
+    def occupied(self, x, y):
+        return self.row_bits[y] >> x & 1
+
+    def merge(self, piece, px, py, color):
+        masks = piece.row_masks
+        if px + piece.min_x < 0 or px + piece.max_x >= self.cols or py < 0 or py + len(masks) > self.rows:
+            return False
+        cid = self.color_id(color)
+        for y, mask in enumerate(masks):
+            self.row_fill[py + y] += bin((mask << px) & ~self.row_bits[py + y]).count('1')
+            self.row_bits[py + y] |= mask << px
+            row_colors = self.colors[py + y]
+            x = 0
+            while mask:
+                if mask & 1:
+                    row_colors[px + x] = cid
+                mask >>= 1
+                x += 1
+        rows = self.rows
+        heights = self.heights
+        for dx, dy in piece.offsets:
+            if rows - py - dy > heights[px + dx]:
+                heights[px + dx] = rows - py - dy
+        return True
+
+    def clear_lines(self, rows=None):
+        # 只检查 rows（升序）中的行，不传时检查全部
+        fill = self.row_fill
+        cols = self.cols
+        full = [y for y in (range(self.rows) if rows is None else rows) if fill[y] == cols]
+        if not full:
+            return 0
+        lines_cleared = len(full)
+        self.row_bits = [0] * lines_cleared + without_rows(self.row_bits, full)
+        self.colors = [bytearray(cols) for _ in range(lines_cleared)] + without_rows(self.colors, full)
+        self.row_fill = [0] * lines_cleared + without_rows(fill, full)
+        self.drop_heights(full)
+        return lines_cleared
+
+    def iter_cells(self, top=0, bottom=None):
+        palette = self.palette
+        row_bits = self.row_bits
+        for y in range(top, self.rows if bottom is None else min(bottom, self.rows)):
+            bits = row_bits[y]
+            if not bits:
+                continue
+            row_colors = self.colors[y]
+            for x in range(self.cols):
+                if bits >> x & 1:
+                    yield x, y, palette[row_colors[x] - 1]
+
+    def occupancy(self):
+        return list(self.row_bits)
@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+import pygame
+
+from engine import COLS, LEFT, RIGHT, ROTATE, SOFT_DROP, SOFT_DROP_RELEASE, HARD_DROP
+
+# 输入：按键事件带上采样时间戳进入队列，左右键按住时按 DAS（首次重复前的延迟）/ARR（重复间隔）生成重复移动，
+# 重复的时间点与帧率无关。模拟循环每一步只取出时间戳落在该步之前的输入（actions_until），
+# 因此一帧内补跑多步时，输入和自动重复会落在各自对应的模拟步里，而不是全部堆到下一帧的第一步。
+# 输入上屏延迟：输入被送入模拟后，下一次画面提交（presented）时把 提交时间-输入时间 交给 latency_hook
+
+InputConfig = namedtuple('InputConfig', ['das', 'arr', 'keys'])
+DEFAULT_KEYS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: ROTATE,
+    pygame.K_DOWN: SOFT_DROP,
+    pygame.K_SPACE: HARD_DROP,
+}
+DEFAULT_CONFIG = InputConfig(das=0.167, arr=0.033, keys=DEFAULT_KEYS)
+SHIFT_ACTIONS = (LEFT, RIGHT)
+
+
+class InputSystem:
+    def __init__(self, config=DEFAULT_CONFIG, latency_hook=None, cols=COLS):
+        self.config = config
+        self.cols = cols  # 棋盘列数，ARR 为 0 时一次移到墙边最多需要的步数
+        self.latency_hook = latency_hook
+        self.clear()
+
+    def clear(self):
+        # 离开游戏状态时丢弃未处理的输入和按住的方向
+        self.queue = []          # [(时间戳, 动作)]
+        self.held = []           # 按住的方向键，最后按下的生效
+        self.next_repeat = None  # 下一次自动重复的时间
+        self.applied = []        # 已送入模拟、尚未上屏的按键时间戳
+
+    def key_down(self, key, timestamp):
+        action = self.config.keys.get(key)
+        if action is None:
+            return False
+        if action in SHIFT_ACTIONS:
+            self.held = [a for a in self.held if a != action] + [action]
+            self.next_repeat = timestamp + self.config.das
+        self.queue.append((timestamp, action))
+        return True
+
+    def key_up(self, key, timestamp):
+        action = self.config.keys.get(key)
+        if action in SHIFT_ACTIONS and action in self.held:
+            was_active = self.held[-1] == action
+            self.held.remove(action)
+            if was_active:
+                # 松开当前方向后，仍按住的另一方向重新开始计算 DAS
+                self.next_repeat = timestamp + self.config.das if self.held else None
+        elif action == SOFT_DROP:
+            self.queue.append((timestamp, SOFT_DROP_RELEASE))
+
+    def actions_until(self, until):
+        # 返回时间戳不晚于 until 的输入（含自动重复），按时间顺序
+        if self.held and self.next_repeat is not None:
+            action = self.held[-1]
+            while self.next_repeat <= until:
+                if self.config.arr <= 0:
+                    # ARR 为 0：一次移到墙边
+                    self.queue.extend([(self.next_repeat, action)] * self.cols)
+                    self.next_repeat = None
+                    break
+                self.queue.append((self.next_repeat, action))
+                self.next_repeat += self.config.arr
+        if not self.queue:
+            return []
+        self.queue.sort(key=lambda item: item[0])
+        count = 0
+        while count < len(self.queue) and self.queue[count][0] <= until:
+            count += 1
+        ready, self.queue = self.queue[:count], self.queue[count:]
+        if self.latency_hook is not None:
+            self.applied.extend(timestamp for timestamp, _ in ready)
+        return [action for _, action in ready]
+
+    def presented(self, timestamp):
+        # 画面提交后调用，报告这一帧包含的输入的上屏延迟
+        if self.applied:
+            for applied in self.applied:
+                self.latency_hook(timestamp - applied)
+            self.applied = []
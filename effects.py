@@ -0,0 +1,253 @@
+import argparse
+import gc
+import os
+import random
+import time
+
+import pygame
+
+from assets import display_format
+from engine import COLORS, EVENT_LOCK, EVENT_CLEAR
+
+# 消行/固定动画。粒子放在预先分配的对象池里（__slots__），存活的粒子占池的前 live 个位置，每个模拟步原地更新，
+# 死亡时与最后一个存活粒子交换位置；生成和回收都不创建对象，池满时新粒子直接丢弃（同时存活的效果数上限），
+# 每个模拟步新生成的粒子数也有上限，大棋盘一次消很多格时按间隔取样。
+# 特效贴图（整行闪光、固定闪光、各颜色碎片）按格子大小预先画好 FADE_LEVELS 级透明度，绘制时按粒子年龄取一张。
+# 消行是一个有时限的棋盘状态（ClearState）：engine 照常推进，update() 不等待动画；渲染层在 CLEAR_TIME 内
+# 按消行前的布局画棋盘并让满行闪白，到时或棋盘再次变化（下一个方块固定、重开）时切到消行后的布局。
+# 动画时间跟随模拟步推进，暂停时冻结，回放导出的画面可复现。坐标以格为单位，渲染时再换算成像素
+#
+#   python effects.py --bench    # 自动玩家硬降、频繁消行，比较关闭/打开特效时的帧时间和 GC 次数
+
+CLEAR_TIME = 0.3      # 消行闪光时长（秒）
+LOCK_TIME = 0.15      # 固定闪光时长
+DEBRIS_TIME = 0.7     # 碎片存活时长
+GRAVITY = 40.0        # 碎片下落加速度（格/秒²）
+MAX_PARTICLES = 256   # 同时存活的粒子上限（对象池容量）
+MAX_SPAWN = 64        # 每个模拟步最多新生成的粒子数
+FADE_LEVELS = 8       # 贴图预先画好的透明度级数
+
+DEBRIS, LOCK_FLASH = range(2)
+
+
+class Particle:
+    __slots__ = ('kind', 'x', 'y', 'vx', 'vy', 'age', 'ttl', 'color')
+
+
+class ParticlePool:
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.items = [Particle() for _ in range(capacity)]
+        self.live = 0
+        self.dropped = 0  # 池满被丢弃的粒子数
+        self.bounds = None  # 存活粒子覆盖的格子范围 (x0, y0, x1, y1)，update() 时顺带算出
+
+    def spawn(self, kind, x, y, vx, vy, ttl, color):
+        if self.live == len(self.items):
+            self.dropped += 1
+            return
+        p = self.items[self.live]
+        p.kind = kind
+        p.x = x
+        p.y = y
+        p.vx = vx
+        p.vy = vy
+        p.age = 0.0
+        p.ttl = ttl
+        p.color = color
+        self.live += 1
+
+    def update(self, dt):
+        items = self.items
+        x0 = y0 = float('inf')
+        x1 = y1 = float('-inf')
+        i = 0
+        while i < self.live:
+            p = items[i]
+            p.age += dt
+            if p.age >= p.ttl:
+                self.live -= 1
+                items[i], items[self.live] = items[self.live], p
+                continue
+            if p.kind == DEBRIS:
+                p.vy += GRAVITY * dt
+                p.x += p.vx * dt
+                p.y += p.vy * dt
+            if p.x < x0:
+                x0 = p.x
+            if p.x > x1:
+                x1 = p.x
+            if p.y < y0:
+                y0 = p.y
+            if p.y > y1:
+                y1 = p.y
+            i += 1
+        self.bounds = (x0, y0, x1, y1) if self.live else None
+
+    def clear(self):
+        self.live = 0
+        self.bounds = None
+
+
+class ClearState:
+    def __init__(self, rows, cells, version):
+        self.rows = rows      # 消掉的行号（升序，消行前的坐标）
+        self.cells = cells    # 这些行里的 (x, y, 颜色)
+        self.version = version  # 消行后的 board_version，棋盘再变化时提前结束
+        self.age = 0.0
+
+    def row_before(self, y):
+        # 消行后的第 y 行在消行前的行号
+        y -= len(self.rows)
+        for row in self.rows:
+            if row > y:
+                break
+            y += 1
+        return y
+
+
+class EffectSystem:
+    def __init__(self, capacity=MAX_PARTICLES, enabled=True, seed=0):
+        self.pool = ParticlePool(capacity)
+        self.enabled = enabled
+        self.rng = random.Random(seed)  # 不占用 engine 的出块随机源
+        self.clearing = None
+
+    def reset(self):
+        self.pool.clear()
+        self.clearing = None
+
+    @property
+    def active(self):
+        return self.clearing is not None or self.pool.live > 0
+
+    def step(self, engine, events, dt):
+        # 每个模拟步在 engine.step() 之后调用：推进已有效果，再按本步事件生成新效果
+        if not self.enabled:
+            return
+        clearing = self.clearing
+        if clearing is not None:
+            clearing.age += dt
+            if clearing.age >= CLEAR_TIME or engine.board_version != clearing.version:
+                self.clearing = None
+        self.pool.update(dt)
+        budget = MAX_SPAWN
+        for event in events:
+            if event[0] == EVENT_LOCK:
+                kind, piece, px, py = event
+                budget -= self.lock(piece, px, py, budget)
+            elif event[0] == EVENT_CLEAR:
+                kind, lines, rows, cells = event
+                self.clearing = ClearState(rows, cells, engine.board_version)
+                budget -= self.debris(cells, budget)
+
+    def lock(self, piece, px, py, budget):
+        # 刚固定的方块每格一次短暂的白色闪光
+        spawned = 0
+        for dx, dy in piece.offsets:
+            if spawned == budget:
+                break
+            self.pool.spawn(LOCK_FLASH, px + dx, py + dy, 0.0, 0.0, LOCK_TIME, None)
+            spawned += 1
+        return spawned
+
+    def debris(self, cells, budget):
+        # 被消掉的格子向上、向两侧迸出碎片，格子多于预算时按间隔取样
+        if budget <= 0:
+            return 0
+        rng = self.rng
+        every = -(-len(cells) // budget)
+        spawned = 0
+        for x, y, color in cells[::every]:
+            self.pool.spawn(DEBRIS, x + 0.33, y + 0.33, rng.uniform(-4.0, 4.0), rng.uniform(-12.0, -4.0),
+                            DEBRIS_TIME * rng.uniform(0.6, 1.0), color)
+            spawned += 1
+        return spawned
+
+
+def fade_frames(size, color, alpha):
+    # 同一贴图的 FADE_LEVELS 级透明度，下标越大越透明
+    frames = []
+    for level in range(FADE_LEVELS):
+        frame = pygame.Surface(size, pygame.SRCALPHA)
+        frame.fill((*color, int(alpha * (FADE_LEVELS - level) / FADE_LEVELS)))
+        frames.append(display_format(frame, alpha=True))
+    return frames
+
+
+def fade_level(age, ttl):
+    return min(FADE_LEVELS - 1, int(age / ttl * FADE_LEVELS))
+
+
+class EffectSprites:
+    # 按格子大小和棋盘列数预先画好的贴图，渲染器在格子大小变化时重建
+    def __init__(self, block, cols):
+        self.key = (block, cols)
+        self.flash = fade_frames((cols * block, block), (255, 255, 255), 220)
+        self.lock = fade_frames((block - 1, block - 1), (255, 255, 255), 160)
+        self.debris_size = max(2, block // 3)
+        self.debris = {color: fade_frames((self.debris_size, self.debris_size), color, 255) for color in COLORS}
+
+    def debris_frames(self, color):
+        frames = self.debris.get(color)
+        if frames is None:
+            frames = self.debris[color] = fade_frames((self.debris_size, self.debris_size), color, 255)
+        return frames
+
+
+def benchmark(frames=3600, seed=1, backend='surface'):
+    # 自动玩家把 SOFT_DROP 换成硬降，几乎每两帧固定一个方块、频繁消行；关闭/打开特效各跑 frames 帧同样的局面，
+    # 统计每帧（模拟一步 + 特效 + render()）的耗时、消行次数、最多存活粒子数和期间发生的 GC 次数
+    from ai import AutoPlayer
+    from bench import percentiles
+    from engine import SOFT_DROP, HARD_DROP
+    from Games import TetrisGame, SIM_DT
+
+    results = {}
+    for enabled in (False, True):
+        game = TetrisGame(render_backend=backend, effects=enabled)
+        game.assets.wait()
+        game.game_state = 'playing'
+        engine = game.engine
+        engine.reset(seed)
+        engine.spawn_new_piece()
+        player = AutoPlayer()
+        times = []
+        clears = 0
+        peak = 0
+        games = 1
+        collections = sum(stats['collections'] for stats in gc.get_stats())
+        for _ in range(frames):
+            actions = [HARD_DROP if action == SOFT_DROP else action for action in player.next_actions(engine)]
+            start = time.perf_counter()
+            events = engine.step(actions, SIM_DT)
+            game.effects.step(engine, events, SIM_DT)
+            game.render()
+            times.append((time.perf_counter() - start) * 1e3)
+            clears += sum(1 for event in events if event[0] == EVENT_CLEAR)
+            peak = max(peak, game.effects.pool.live)
+            if engine.game_over:
+                engine.reset(seed + games)
+                game.effects.reset()
+                engine.spawn_new_piece()
+                games += 1
+        result = percentiles(times)
+        result['max'] = max(times)
+        result.update(clears=clears, peak_particles=peak, dropped=game.effects.pool.dropped,
+                      gc=sum(stats['collections'] for stats in gc.get_stats()) - collections)
+        results['on' if enabled else 'off'] = result
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='消行/固定动画')
+    parser.add_argument('--bench', action='store_true', help='比较关闭/打开特效时的帧时间')
+    parser.add_argument('--frames', type=int, default=3600)
+    parser.add_argument('--renderer', default='surface', help='渲染后端')
+    args = parser.parse_args()
+    if args.bench:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        for name, r in benchmark(args.frames, backend=args.renderer).items():
+            print(f'特效{"开" if name == "on" else "关"}  p50 {r["p50"]:.3f}ms  p95 {r["p95"]:.3f}ms  '
+                  f'p99 {r["p99"]:.3f}ms  max {r["max"]:.3f}ms  消行 {r["clears"]}  '
+                  f'粒子峰值 {r["peak_particles"]}（丢弃 {r["dropped"]}）  GC {r["gc"]} 次')
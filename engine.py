@@ -0,0 +1,300 @@
+import random
+
+from pieces import PIECES, get_piece, rotated
+
+# 纯逻辑游戏核心：不依赖 pygame，可在无窗口环境下高速运行（机器人、模糊测试、回归测试）
+# 棋盘尺寸按局配置（Board(cols, rows)），COLS/ROWS 只是默认值
+COLS = 10
+ROWS = 20
+
+DEFAULT_DROP_SPEED = 2.5  # 默认下落速度（格/秒）
+SOFT_DROP_SPEED = 15.0    # 按住下键时的下落速度
+LINE_SCORE = 100          # 每消一行得分
+SIM_DT = 1.0 / 60         # 固定模拟步长（秒）：游戏、服务器按这个步长调用 step()，模拟结果与实际帧率无关
+
+# 方块颜色（形状见 pieces.SHAPES）
+COLORS = [
+    (255, 0, 0),    # 红色
+    (0, 255, 0),    # 绿色
+    (0, 0, 255),    # 蓝色
+    (255, 255, 0),  # 黄色
+    (255, 0, 255),  # 紫色
+    (0, 255, 255),  # 青色
+    (255, 165, 0)   # 橙色
+]
+
+# step() 接受的输入动作
+LEFT = 'left'
+RIGHT = 'right'
+ROTATE = 'rotate'
+SOFT_DROP = 'soft_drop'
+SOFT_DROP_RELEASE = 'soft_drop_release'
+HARD_DROP = 'hard_drop'
+# 动作编码（回放文件、批量模拟使用）：ACTIONS[code] 为对应动作，0 表示无操作；新动作只能追加在末尾
+ACTIONS = (None, LEFT, RIGHT, ROTATE, SOFT_DROP, SOFT_DROP_RELEASE, HARD_DROP)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# step() 返回的事件（元组，第一项为事件类型）：
+#   (EVENT_LOCK, 方块, x, y)               固定的方块及其位置
+#   (EVENT_CLEAR, 行数, 行号, 方块)         消掉的行号（升序，消行前的坐标）和其中的 (x, y, 颜色)，供消行动画使用
+EVENT_ROTATE = 'rotate'
+EVENT_LOCK = 'lock'
+EVENT_CLEAR = 'clear'
+EVENT_GAME_OVER = 'game_over'
+
+
+def without_rows(items, removed):
+    # 删去 removed（升序行号）对应的元素，按段切片拼接，不逐行 del
+    result = []
+    start = 0
+    for y in removed:
+        result += items[start:y]
+        start = y + 1
+    result += items[start:]
+    return result
+
+
+class HeightIndex:
+    # 两种棋盘后端共用的列高度索引：heights[x] 为第 x 列最高方块到底部的高度。
+    # 子类提供 rows、heights、collides(piece, px, py) 和 occupied(x, y)
+
+    def landing_row(self, piece, px, py):
+        # 从 py 竖直下落时 collides 首次为真的行。方块完全位于各列最高方块之上时无需扫描；
+        # 已移进悬空方块下方时退回逐行下移
+        rows = self.rows
+        heights = self.heights
+        y = min(rows - heights[px + dx] - 1 - dy for dx, dy in piece.bottom)
+        if y >= py:
+            return y
+        while not self.collides(piece, px, py):
+            py += 1
+        return py
+
+    def drop_heights(self, full):
+        # 消掉 full（升序）中的行之后更新列高度：满行以上的方块整体下移；
+        # 最高方块正好在最上面的满行里的列，向下找新的最高方块
+        rows = self.rows
+        heights = self.heights
+        lines_cleared = len(full)
+        top_cleared = full[0]
+        occupied = self.occupied
+        for x in range(len(heights)):
+            if rows - heights[x] < top_cleared:
+                heights[x] -= lines_cleared
+            else:
+                y = top_cleared + lines_cleared
+                while y < rows and not occupied(x, y):
+                    y += 1
+                heights[x] = rows - y
+
+
+# 列表网格后端：每格存放颜色元组或 None
+# 增量维护两个索引：heights[x]（见 HeightIndex）和 row_fill[y]，即第 y 行已填格数。
+# 着陆行由列高度和方块底部轮廓直接算出（landing_row），消行只检查刚固定的方块覆盖的行
+class Board(HeightIndex):
+    def __init__(self, cols=COLS, rows=ROWS):
+        self.cols = cols
+        self.rows = rows
+        self.reset()
+
+    def reset(self):
+        self.grid = [[None] * self.cols for _ in range(self.rows)]
+        self.heights = [0] * self.cols
+        self.row_fill = [0] * self.rows
+
+    def collides(self, piece, px, py):
+        # 与原 check_collision 语义一致：检查方块下方一格是否被占用或越界
+        # piece 为 pieces.PieceState，直接使用预计算的填充格偏移
+        for dx, dy in piece.offsets:
+            x = px + dx
+            y = py + dy
+            if (y >= self.rows - 1 or
+                x < 0 or x >= self.cols or
+                self.grid[y + 1][x]):
+                return True
+        return False
+
+    def occupied(self, x, y):
+        return self.grid[y][x] is not None
+
+    def merge(self, piece, px, py, color):
+        # 越界时不合并并返回 False
+        for dx, dy in piece.offsets:
+            if not (0 <= py + dy < self.rows and 0 <= px + dx < self.cols):
+                return False
+        rows = self.rows
+        heights = self.heights
+        for dx, dy in piece.offsets:
+            x = px + dx
+            y = py + dy
+            row = self.grid[y]
+            if row[x] is None:
+                self.row_fill[y] += 1
+            row[x] = color
+            if rows - y > heights[x]:
+                heights[x] = rows - y
+        return True
+
+    def clear_lines(self, rows=None):
+        # 只检查 rows（升序，通常是刚固定的方块覆盖的行）中的行，不传时检查全部
+        fill = self.row_fill
+        cols = self.cols
+        full = [y for y in (range(self.rows) if rows is None else rows) if fill[y] == cols]
+        if not full:
+            return 0
+        lines_cleared = len(full)
+        self.grid = [[None] * cols for _ in range(lines_cleared)] + without_rows(self.grid, full)
+        self.row_fill = [0] * lines_cleared + without_rows(fill, full)
+        self.drop_heights(full)
+        return lines_cleared
+
+    def iter_cells(self, top=0, bottom=None):
+        # 遍历 [top, bottom) 行中已固定的方块：(x, y, color)
+        grid = self.grid
+        for y in range(top, self.rows if bottom is None else min(bottom, self.rows)):
+            for x, color in enumerate(grid[y]):
+                if color:
+                    yield x, y, color
+
+    def occupancy(self):
+        # 每行的占用位掩码（第 x 位代表第 x 列），供搜索/AI 使用
+        return [sum(1 << x for x, color in enumerate(row) if color) for row in self.grid]
+
+
+class TetrisEngine:
+    def __init__(self, board=None, rng=None, seed=None):
+        self.board = board if board is not None else Board()
+        self.fixed_rng = rng  # 外部传入的出块随机源（需提供 randrange/choice），reset 时不重新播种
+        self.board_version = 0  # 棋盘内容每次变化时递增，供渲染层判断是否需要重绘
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # 每局使用独立的带种子随机源，同一种子 + 同一输入序列可完全复现整局
+        if self.fixed_rng is not None:
+            self.seed = None
+            self.rng = self.fixed_rng
+        else:
+            self.seed = seed if seed is not None else random.getrandbits(32)
+            self.rng = random.Random(self.seed)
+        self.board.reset()
+        self.board_version += 1
+        self.score = 0
+        self.drop_speed = DEFAULT_DROP_SPEED
+        self.piece = None  # 当前下落方块的 pieces.PieceState
+        self.current_color = None
+        self.current_x = 0
+        self.current_y = 0
+        self.game_over = False
+        self.events = []
+
+    @property
+    def current_piece(self):
+        # 当前方块的 0/1 矩阵，供绘制使用
+        return self.piece.cells if self.piece is not None else None
+
+    def spawn_new_piece(self):
+        if self.game_over:
+            return
+        self.piece = get_piece(self.rng.randrange(len(PIECES)))
+        self.current_color = self.rng.choice(COLORS)
+        self.current_x = self.board.cols//2 - self.piece.width//2
+        self.current_y = 0
+        if self.check_collision():
+            self.game_over = True
+            self.piece = None
+            self.events.append((EVENT_GAME_OVER,))
+
+    def check_collision(self, piece=None, x=None):
+        if piece is None:
+            piece = self.piece
+        if x is None:
+            x = self.current_x
+        return self.board.collides(piece, x, int(self.current_y))
+
+    def merge_to_grid(self):
+        if not self.board.merge(self.piece, self.current_x, int(self.current_y), self.current_color):
+            self.game_over = True
+            self.events.append((EVENT_GAME_OVER,))
+            return
+        self.board_version += 1
+        self.events.append((EVENT_LOCK, self.piece, self.current_x, int(self.current_y)))
+
+    def clear_lines(self, rows=None):
+        # rows 为需要检查的行，不传时检查整个棋盘；有满行时先取出其中的方块放进消行事件
+        board = self.board
+        full = [y for y in (range(board.rows) if rows is None else rows) if board.row_fill[y] == board.cols]
+        if not full:
+            return 0
+        cells = [cell for y in full for cell in board.iter_cells(y, y + 1)]
+        lines_cleared = board.clear_lines(full)
+        self.score += lines_cleared * LINE_SCORE
+        self.board_version += 1
+        self.events.append((EVENT_CLEAR, lines_cleared, full, cells))
+        return lines_cleared
+
+    def move_piece(self, dx):
+        if self.piece is None:
+            return
+        if not self.check_collision(x=self.current_x + dx):
+            self.current_x += dx
+
+    def rotate_piece(self):
+        if self.piece is None:
+            return
+        # 查表得到顺时针旋转后的状态，依次尝试踢墙偏移，全部失败则保持原状态
+        new_piece = rotated(self.piece)
+        for offset in new_piece.kicks:
+            if not self.check_collision(new_piece, self.current_x + offset):
+                self.piece = new_piece
+                self.current_x += offset
+                self.events.append((EVENT_ROTATE,))
+                return
+
+    def ghost_y(self):
+        # 当前方块竖直下落后的着陆行，供硬降和落点预览使用
+        if self.piece is None:
+            return None
+        return self.board.landing_row(self.piece, self.current_x, int(self.current_y))
+
+    def hard_drop(self):
+        # 直接移到着陆行，同一步的 update() 中固定
+        y = self.ghost_y()
+        if y is not None and y > self.current_y:
+            self.current_y = y
+
+    def apply_action(self, action):
+        if action == LEFT:
+            self.move_piece(-1)
+        elif action == RIGHT:
+            self.move_piece(1)
+        elif action == ROTATE:
+            self.rotate_piece()
+        elif action == SOFT_DROP:
+            self.drop_speed = SOFT_DROP_SPEED
+        elif action == SOFT_DROP_RELEASE:
+            self.drop_speed = DEFAULT_DROP_SPEED  # 始终恢复初始速度
+        elif action == HARD_DROP:
+            self.hard_drop()
+
+    def update(self, dt):
+        if self.game_over or self.piece is None:
+            return
+        if not self.check_collision():
+            # 单次最多下落到下一行，避免大步长穿过障碍
+            self.current_y = min(self.current_y + self.drop_speed * dt, int(self.current_y) + 1)
+        else:
+            self.merge_to_grid()
+            if self.game_over:
+                return
+            # 只有刚固定的方块覆盖的行可能变满
+            y = int(self.current_y)
+            self.clear_lines(range(y, y + self.piece.height))
+            self.spawn_new_piece()
+
+    def step(self, actions=(), dt=0.0):
+        # 先应用输入，再推进 dt 秒；返回本步产生的事件列表
+        self.events = []
+        for action in actions:
+            self.apply_action(action)
+        self.update(dt)
+        return self.events
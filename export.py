@@ -0,0 +1,150 @@
+import os
+
+# 导出不需要窗口和声音；标准输出可能是视频流，不打印 pygame 的欢迎信息
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from engine import TetrisEngine, Board
+from renderer import LOGICAL_SIZE
+from replay import Replay
+
+# 回放导出：用离屏渲染后端（OffscreenRenderer，没有窗口）不限速地重新模拟回放并逐帧 render()，
+# 帧像素交给线程池编码为 PNG 序列或原始 RGB 流（可直接接 ffmpeg）。
+# 模拟和渲染在主线程，编码在工作线程：PNG 只用 zlib 压缩（压缩时释放 GIL），多个线程并行编码；
+# 原始流必须按顺序写出，只用一个写线程。主线程最多领先 in_flight 帧，超出时等待最早的一帧写完。
+# 每帧用 pygame.image.tobytes 从 screen 取一次像素（screen 下一帧会被重画，这是唯一的一次拷贝），
+# 工作线程按 memoryview 逐行切片压缩或整块写出，不再复制
+#
+#   python export.py replays/xxx.trpl --png clip/           # clip/000000.png ...
+#   python export.py replays/xxx.trpl --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 300x600 -r 60 -i - clip.mp4
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_LEVEL = 1  # 压缩级别 1 比默认的 6 快约一倍，文件大一倍多
+IN_FLIGHT = 32
+
+
+def png_chunk(kind, body):
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(body, zlib.crc32(kind)))
+
+
+def encode_png(pixels, size, level=PNG_LEVEL):
+    # RGB 像素 -> PNG 文件内容，每行前加滤波类型 0
+    width, height = size
+    stride = width * 3
+    view = memoryview(pixels)
+    compressor = zlib.compressobj(level)
+    parts = []
+    for y in range(height):
+        parts.append(compressor.compress(b'\0'))
+        parts.append(compressor.compress(view[y * stride:(y + 1) * stride]))
+    parts.append(compressor.flush())
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + png_chunk(b'IHDR', header) + png_chunk(b'IDAT', b''.join(parts)) + png_chunk(b'IEND', b'')
+
+
+class PngSequence:
+    def __init__(self, directory, size, workers=None, level=PNG_LEVEL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.level = level
+        self.pool = ThreadPoolExecutor(workers or os.cpu_count())
+
+    def submit(self, index, pixels):
+        return self.pool.submit(self.write, index, pixels)
+
+    def write(self, index, pixels):
+        with open(os.path.join(self.directory, f'{index:06d}.png'), 'wb') as f:
+            f.write(encode_png(pixels, self.size, self.level))
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class RawStream:
+    # 逐帧写出 RGB24 像素，'-' 表示标准输出
+    def __init__(self, path):
+        if path == '-':
+            self.file = sys.stdout.buffer
+            sys.stdout = sys.stderr  # 资源加载等日志改打到标准错误，不混进视频流
+        else:
+            self.file = open(path, 'wb')
+        self.pool = ThreadPoolExecutor(1)
+
+    def submit(self, index, pixels):
+        return self.pool.submit(self.file.write, pixels)
+
+    def close(self):
+        self.pool.shutdown()
+        self.file.flush()
+        if self.file is not sys.__stdout__.buffer:
+            self.file.close()
+
+
+def export(replay, sink, fps=60, size=None, in_flight=IN_FLIGHT, effects=True):
+    # 返回 (帧数, 总耗时, 主线程模拟+渲染+取像素的耗时)
+    from Games import TetrisGame
+
+    game = TetrisGame(board_size=(replay.cols, replay.rows), render_backend='offscreen', effects=effects)
+    game.assets.wait()  # 背景图解码完成后再开始，否则开头几帧是占位图
+    if size and size != LOGICAL_SIZE:
+        game.renderer.resize(size)
+    game.engine = TetrisEngine(board=Board(replay.cols, replay.rows), seed=replay.seed)
+    game.game_state = 'playing'
+    every = max(1, round(1 / (replay.dt * fps)))  # 每隔几个模拟帧输出一帧
+    pending = deque()
+    frames = 0
+    busy = 0.0
+    start = time.perf_counter()
+    for tick, spawn, actions in replay.ticks():
+        began = time.perf_counter()
+        if spawn:
+            game.engine.spawn_new_piece()
+        game.effects.step(game.engine, game.engine.step(actions, replay.dt), replay.dt)
+        if tick % every == 0 or game.engine.game_over:
+            if game.engine.game_over:
+                game.game_state = 'game_over'
+            game.render()
+            pending.append(sink.submit(frames, pygame.image.tobytes(game.screen, 'RGB')))
+            frames += 1
+        busy += time.perf_counter() - began
+        if len(pending) > in_flight:
+            pending.popleft().result()
+    for future in pending:
+        future.result()
+    sink.close()
+    return frames, time.perf_counter() - start, busy
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='把回放导出为 PNG 序列或原始 RGB 视频流')
+    parser.add_argument('path')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--png', metavar='DIR', help='PNG 序列的输出目录')
+    output.add_argument('--raw', metavar='FILE', help='RGB24 原始帧输出文件，- 为标准输出')
+    parser.add_argument('--fps', type=int, default=60, choices=(15, 30, 60))
+    parser.add_argument('--size', type=int, nargs=2, metavar=('W', 'H'), help='输出尺寸，默认为逻辑画布的 300x600')
+    parser.add_argument('--workers', type=int, help='PNG 编码线程数，默认为 CPU 核数')
+    parser.add_argument('--level', type=int, default=PNG_LEVEL, choices=range(10), help='PNG 压缩级别')
+    parser.add_argument('--no-effects', action='store_true', help='不画消行/固定动画')
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    size = tuple(args.size) if args.size else LOGICAL_SIZE
+    sink = PngSequence(args.png, size, args.workers, args.level) if args.png else RawStream(args.raw)
+    frames, elapsed, busy = export(replay, sink, args.fps, size, effects=not args.no_effects)
+    # 报告写到标准错误，标准输出可能是视频流
+    print(f'{frames} 帧（{frames / args.fps:.1f} 秒视频）用时 {elapsed:.2f} 秒：'
+          f'{frames / elapsed:,.0f} 帧/秒，{frames / args.fps / elapsed:.1f} 倍速；'
+          f'主线程模拟+渲染 {busy / frames * 1000:.2f} ms/帧', file=sys.stderr)
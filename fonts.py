@@ -0,0 +1,52 @@
+import pygame
+from collections import OrderedDict
+
+# 字体注册表：启动时一次性解析系统字体（楷体缺失时退回黑体），之后按 (字体名, 字号) 复用 Font 对象
+# 文字缓存：按 (字体, 文字, 颜色, 缩放) 缓存渲染结果，只有内容变化的文字（如分数）才会重新渲染
+
+# 界面用到的全部字体，启动时预先加载
+FONT_SPECS = [
+    ('kaiti', 20), ('kaiti', 24), ('kaiti', 28), ('kaiti', 32), ('kaiti', 40),
+    ('simhei', 17), ('simhei', 20), ('simhei', 24),
+]
+
+
+class FontRegistry:
+    def __init__(self, specs=FONT_SPECS):
+        self.kaiti_available = bool(pygame.font.match_font('kaiti'))
+        self.fonts = {}
+        for name, size in specs:
+            self.get(name, size)
+
+    def get(self, name, size):
+        if name == 'kaiti' and not self.kaiti_available:
+            name = 'simhei'
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = self.fonts[(name, size)] = pygame.font.SysFont(name, size)
+        return font
+
+
+class TextCache:
+    def __init__(self, fonts, max_size=128):
+        self.fonts = fonts
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font_spec, text, color, scale=1.0):
+        key = (font_spec, text, color, scale)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = self.fonts.get(*font_spec).render(text, True, color)
+        if scale != 1.0:
+            surface = pygame.transform.scale(surface, (int(surface.get_width() * scale), int(surface.get_height() * scale)))
+        self.surfaces[key] = surface
+        # 超出容量时淘汰最久未使用的文字
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
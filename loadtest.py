@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from bench import percentiles
+from engine import ACTION_CODES, SIM_DT, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP
+from server import (JOIN, INPUT, STATS, JOINED, DELTA, STATS_REPLY, JOIN_MSG, INPUT_MSG, JOINED_MSG, DELTA_MSG,
+                    STATS_MSG, F_GAME_OVER, pack_message, read_messages)
+
+# 会话服务器压力测试：在若干连接上开 N 个会话，每个会话按设定频率发送随机输入批次，对局结束后立即重开，
+# 保持会话数不变。每一级统计服务器的帧延迟分位数（STATS）、CPU 占用和客户端测得的输入确认延迟
+# （发送 INPUT 到收到对应帧 DELTA），会话数逐级翻倍，直到 p99 帧延迟超出一帧的时长。
+# 服务器是单线程事件循环，只占用一个核：单核会话数 = 满足预算的最大会话数，以及按 CPU 占用比例折算的估计值
+#
+#   python loadtest.py                               # 自动启动本地服务器，从 250 个会话开始逐级加压
+#   python loadtest.py --port 7721 --sessions 2000   # 连接已有服务器，只测一级
+
+INPUT_INTERVAL = 0.05  # 输入发送任务的唤醒间隔（秒）
+INPUT_ACTIONS = (LEFT, RIGHT, ROTATE, LEFT, RIGHT, SOFT_DROP, HARD_DROP)
+
+
+class LoadConnection:
+    def __init__(self, reader, writer, rng, cols, rows):
+        self.reader = reader
+        self.writer = writer
+        self.rng = rng
+        self.cols = cols
+        self.rows = rows
+        self.sessions = {}       # 会话 -> 最近收到的帧号
+        self.pending_acks = {}   # 会话 -> (目标帧号, 发送时刻)，每个会话同时只跟踪一个
+        self.joining = {}        # 令牌 -> Future
+        self.next_token = 1
+        self.stats_future = None
+        self.latencies = []
+        self.bytes = 0
+        self.target = 0          # 应保持的会话数
+        self.reader_task = asyncio.create_task(self.read_loop())
+
+    def join(self):
+        token = self.next_token
+        self.next_token += 1
+        self.joining[token] = asyncio.get_running_loop().create_future()
+        self.writer.write(pack_message(JOIN, JOIN_MSG.pack(token, 0, self.cols, self.rows)))
+        return self.joining[token]
+
+    async def fill(self, count):
+        # 补足会话数，等待全部 JOINED
+        self.target = count
+        futures = [self.join() for _ in range(count - len(self.sessions) - len(self.joining))]
+        if futures:
+            await asyncio.gather(*futures)
+
+    async def read_loop(self):
+        async for kind, payload in read_messages(self.reader):
+            self.bytes += len(payload) + 3
+            if kind == DELTA:
+                session, tick, flags = DELTA_MSG.unpack_from(payload)
+                if session not in self.sessions:
+                    continue
+                self.sessions[session] = tick
+                ack = self.pending_acks.get(session)
+                if ack is not None and tick >= ack[0]:
+                    self.latencies.append(time.perf_counter() - ack[1])
+                    del self.pending_acks[session]
+                if flags & F_GAME_OVER:
+                    # 对局结束，重开一个会话保持总数
+                    del self.sessions[session]
+                    self.pending_acks.pop(session, None)
+                    if len(self.sessions) + len(self.joining) < self.target:
+                        self.join()
+            elif kind == JOINED:
+                token, session, seed = JOINED_MSG.unpack(payload)
+                if session:
+                    self.sessions[session] = 0
+                future = self.joining.pop(token)
+                if not future.done():
+                    future.set_result(session)
+            elif kind == STATS_REPLY and self.stats_future is not None:
+                self.stats_future.set_result(STATS_MSG.unpack(payload))
+
+    async def input_loop(self, rate):
+        # 每个会话平均每秒发送 rate 个输入批次（1~2 个动作）
+        chance = rate * INPUT_INTERVAL
+        rng = self.rng
+        while True:
+            await asyncio.sleep(INPUT_INTERVAL)
+            now = time.perf_counter()
+            out = bytearray()
+            for session, tick in self.sessions.items():
+                if rng.random() >= chance:
+                    continue
+                codes = bytes(ACTION_CODES[rng.choice(INPUT_ACTIONS)] for _ in range(rng.randint(1, 2)))
+                out += pack_message(INPUT, INPUT_MSG.pack(session, tick + 1) + codes)
+                if session not in self.pending_acks:
+                    self.pending_acks[session] = (tick + 1, now)
+            if out:
+                self.writer.write(bytes(out))
+
+    async def request_stats(self):
+        self.stats_future = asyncio.get_running_loop().create_future()
+        self.writer.write(pack_message(STATS))
+        try:
+            return await self.stats_future
+        finally:
+            self.stats_future = None
+
+    def reset_counters(self):
+        self.latencies = []
+        self.bytes = 0
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    conns = []
+    for _ in range(args.connections):
+        reader, writer = await open_connection(args)
+        conns.append(LoadConnection(reader, writer, rng, args.cols, args.rows))
+    input_tasks = [asyncio.create_task(conn.input_loop(args.input_rate)) for conn in conns]
+    budget = SIM_DT * 1000
+    levels = [args.sessions] if args.sessions else [250 * 2 ** i for i in range(args.max_steps)]
+    best = None
+    print(f'{"会话数":>8} {"帧延迟p50":>10} {"p95":>8} {"p99":>8} {"max":>8} {"跳帧":>6} {"CPU":>6} '
+          f'{"确认p50":>9} {"p99":>8} {"下行KiB/s":>10}')
+    try:
+        for count in levels:
+            per_conn = [count // len(conns) + (i < count % len(conns)) for i in range(len(conns))]
+            await asyncio.gather(*(conn.fill(n) for conn, n in zip(conns, per_conn)))
+            await asyncio.sleep(args.warmup)
+            await conns[0].request_stats()  # 丢弃加压过程中的统计
+            for conn in conns:
+                conn.reset_counters()
+            start = time.perf_counter()
+            await asyncio.sleep(args.duration)
+            sessions, ticks, skipped, p50, p95, p99, worst, cpu = await conns[0].request_stats()
+            elapsed = time.perf_counter() - start
+            client = percentiles([t * 1000 for conn in conns for t in conn.latencies] or [0.0])
+            received = sum(conn.bytes for conn in conns)
+            print(f'{sessions:8d} {p50:9.2f}ms {p95:6.2f}ms {p99:6.2f}ms {worst:6.2f}ms {skipped:6d} {cpu:5.0%} '
+                  f'{client["p50"]:7.2f}ms {client["p99"]:6.2f}ms '
+                  f'{received / elapsed / 1024:10.1f}')
+            if p99 > budget:
+                break
+            best = (sessions, cpu)
+    finally:
+        for task in input_tasks:
+            task.cancel()
+        for conn in conns:
+            conn.writer.close()
+    if best is None:
+        print(f'没有任何一级满足 p99 帧延迟 <= {budget:.1f}ms')
+    else:
+        sessions, cpu = best
+        estimate = f'，按 CPU 占用折算约 {sessions / cpu:,.0f}' if cpu > 0 else ''
+        print(f'单核会话数：p99 帧延迟 <= {budget:.1f}ms 时最多 {sessions:,}{estimate}')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(args):
+    # 在子进程中启动本地服务器，等待端口可连接
+    args.port = free_port()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+    process = subprocess.Popen([sys.executable, script, '--host', args.host, '--port', str(args.port)],
+                               stdout=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection((args.host, args.port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('本地服务器启动失败')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='对局服务器压力测试')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='连接已有服务器；不指定时自动启动本地服务器')
+    parser.add_argument('--unix', help='连接 Unix 域套接字')
+    parser.add_argument('--sessions', type=int, help='只测这一个会话数')
+    parser.add_argument('--max-steps', type=int, default=8, help='逐级加压的最多级数')
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--input-rate', type=float, default=2.0, help='每个会话每秒的输入批次数')
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--duration', type=float, default=5.0, help='每级的统计时长（秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    process = start_server(args) if args.port is None and args.unix is None else None
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+# 方块定义表：导入时一次性算出 SHAPES 每个形状的全部旋转状态（不可变元组），
+# 运行时通过 (shape_id, rotation) 引用，旋转时不再分配新列表
+
+# 方块形状
+SHAPES = [
+    [[1,1,1,1]],
+    [[1,1],[1,1]],
+    [[1,1,1],[0,1,0]],
+    [[1,1,1],[1,0,0]],
+    [[1,1,1],[0,0,1]],
+    [[1,1,0],[0,1,1]],
+    [[0,1,1],[1,1,0]],
+    [[1,1,1],[1,0,1]]
+]
+
+NUM_ROTATIONS = 4
+KICK_OFFSETS = (0, 1, -1, 2, -2)  # 旋转受阻时依次尝试的横向偏移
+
+PieceState = namedtuple('PieceState', [
+    'shape_id', 'rotation',
+    'cells',      # 0/1 矩阵（元组的元组），绘制时按行遍历
+    'offsets',    # 填充格相对左上角的 (dx, dy)
+    'width', 'height',
+    'min_x', 'max_x',  # 最左/最右填充列
+    'row_masks',  # 每行的位掩码（第 x 位代表第 x 列），供 BitBoard 使用
+    'kicks',      # 旋转进入该状态时的横向踢墙偏移
+    'bottom',     # 底部轮廓：每个有填充的列的 (dx, 该列最低填充格的 dy)，用于按列高度计算着陆行
+])
+
+
+def rotate_cw(cells):
+    # 顺时针旋转矩阵
+    return tuple(tuple(row) for row in zip(*cells[::-1]))
+
+
+def build_state(shape_id, rotation, cells):
+    offsets = tuple((x, y) for y, row in enumerate(cells) for x, val in enumerate(row) if val)
+    row_masks = tuple(sum(1 << x for x, val in enumerate(row) if val) for row in cells)
+    xs = [x for x, _ in offsets]
+    bottom = tuple((x, max(dy for dx, dy in offsets if dx == x)) for x in sorted(set(xs)))
+    return PieceState(shape_id, rotation, cells, offsets,
+                      len(cells[0]), len(cells), min(xs), max(xs),
+                      row_masks, KICK_OFFSETS, bottom)
+
+
+def build_rotations(shape_id, shape):
+    cells = tuple(tuple(row) for row in shape)
+    states = []
+    for rotation in range(NUM_ROTATIONS):
+        states.append(build_state(shape_id, rotation, cells))
+        cells = rotate_cw(cells)
+    return tuple(states)
+
+
+# PIECES[shape_id][rotation] -> PieceState
+PIECES = tuple(build_rotations(i, shape) for i, shape in enumerate(SHAPES))
+
+
+def get_piece(shape_id, rotation=0):
+    return PIECES[shape_id][rotation % NUM_ROTATIONS]
+
+
+def rotated(piece):
+    return PIECES[piece.shape_id][(piece.rotation + 1) % NUM_ROTATIONS]
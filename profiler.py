@@ -0,0 +1,156 @@
+import cProfile
+import csv
+import os
+import time
+from array import array
+from collections import deque
+
+import pygame
+
+# 分阶段帧计时：游戏循环和渲染器在每个阶段结束时调用 mark(阶段)，累加自上一次标记以来的耗时，
+# 每帧结束时写入固定容量的环形缓冲区。关闭时 mark() 只做一次属性判断，开销可以忽略。
+# F3 切换叠加层（FPS、帧时间曲线、各阶段平均耗时），F4 把缓冲区导出为 CSV。
+# 可选 cProfile：整局采样在退出时写入文件；或逐帧采样，只保存超过阈值的慢帧。
+# 输入上屏延迟由 controls.InputSystem 通过 record_latency 报告，叠加层显示其中位数和最大值
+
+PHASES = ('events', 'update', 'background', 'board', 'piece', 'effects', 'hud', 'menu', 'overlay', 'flip')
+EVENTS, UPDATE, BACKGROUND, BOARD, PIECE, EFFECTS, HUD, MENU, OVERLAY, FLIP = range(len(PHASES))
+
+OVERLAY_SIZE = (220, 196)
+OVERLAY_REFRESH = 10  # 叠加层每隔多少帧重新绘制一次
+GRAPH_FRAMES = 200    # 曲线显示的帧数
+GRAPH_MAX_MS = 50.0
+
+
+class FrameProfiler:
+    def __init__(self, capacity=600, enabled=False, dump_path=None, cprofile_path=None,
+                 slow_frame_ms=None, slow_frame_dir='profiles'):
+        self.capacity = capacity
+        self.always = enabled or slow_frame_ms is not None
+        self.overlay = False
+        self.enabled = False  # 只在帧开始时根据 always/overlay 更新，保证一帧内的标记完整
+        self.phases = array('d', bytes(8 * capacity * len(PHASES)))
+        self.intervals = array('d', bytes(8 * capacity))  # 相邻两帧开始的间隔（含限帧等待）
+        self.frames = 0
+        self.latencies = deque(maxlen=capacity)
+        self.current = [0.0] * len(PHASES)
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.dump_path = dump_path
+        self.slow_frame = slow_frame_ms / 1000 if slow_frame_ms is not None else None
+        self.slow_frame_dir = slow_frame_dir
+        self.frame_profile = None
+        self.cprofile_path = cprofile_path
+        self.session_profile = None
+        if cprofile_path:
+            self.session_profile = cProfile.Profile()
+            self.session_profile.enable()
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+
+    def begin_frame(self):
+        self.enabled = self.always or self.overlay
+        if not self.enabled:
+            self.frame_start = 0.0
+            return
+        now = time.perf_counter()
+        if self.frame_start and self.frames:
+            self.intervals[(self.frames - 1) % self.capacity] = now - self.frame_start
+        self.frame_start = self.last = now
+        if self.slow_frame is not None and self.session_profile is None:
+            self.frame_profile = cProfile.Profile()
+            self.frame_profile.enable()
+
+    def mark(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.current[phase] += now - self.last
+            self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self.frame_start
+        base = (self.frames % self.capacity) * len(PHASES)
+        current = self.current
+        for i in range(len(PHASES)):
+            self.phases[base + i] = current[i]
+            current[i] = 0.0
+        self.intervals[self.frames % self.capacity] = elapsed
+        if self.frame_profile is not None:
+            self.frame_profile.disable()
+            if elapsed > self.slow_frame:
+                os.makedirs(self.slow_frame_dir, exist_ok=True)
+                self.frame_profile.dump_stats(os.path.join(self.slow_frame_dir, f'slow-frame-{self.frames}.prof'))
+            self.frame_profile = None
+        self.frames += 1
+
+    def record_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def recent(self, count=None):
+        # 最近 count 帧（从旧到新）的 (帧间隔, [各阶段耗时])
+        count = min(count or self.capacity, self.frames, self.capacity)
+        rows = []
+        for frame in range(self.frames - count, self.frames):
+            slot = frame % self.capacity
+            base = slot * len(PHASES)
+            rows.append((self.intervals[slot], self.phases[base:base + len(PHASES)].tolist()))
+        return rows
+
+    def dump(self, path=None):
+        # 导出为 CSV（毫秒），返回文件路径
+        path = path or self.dump_path or f'profile-{time.strftime("%Y%m%d-%H%M%S")}.csv'
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame_ms',) + PHASES)
+            for interval, phases in self.recent():
+                writer.writerow([f'{interval * 1000:.3f}'] + [f'{t * 1000:.3f}' for t in phases])
+        return path
+
+    def finish(self):
+        # 退出时写出缓冲区和整局 cProfile
+        if self.dump_path and self.frames:
+            self.dump()
+        if self.session_profile is not None:
+            self.session_profile.disable()
+            self.session_profile.dump_stats(self.cprofile_path)
+            self.session_profile = None
+
+
+def build_overlay(profiler, font):
+    # 左上角的半透明统计面板
+    width, height = OVERLAY_SIZE
+    surface = pygame.Surface(OVERLAY_SIZE, pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 170))
+    rows = profiler.recent(GRAPH_FRAMES)
+    if not rows:
+        return surface
+    intervals = [interval for interval, _ in rows]
+    fps = len(intervals) / sum(intervals) if sum(intervals) else 0.0
+    surface.blit(font.render(f'FPS {fps:5.1f}  帧 {intervals[-1] * 1000:5.1f}ms', True, (255, 255, 255)), (6, 4))
+
+    # 帧时间曲线，绿线为 60 FPS 预算
+    graph = pygame.Rect(6, 26, width - 12, 50)
+    pygame.draw.rect(surface, (40, 40, 40, 200), graph)
+    budget_y = graph.bottom - int(graph.height * (1000 / 60) / GRAPH_MAX_MS)
+    pygame.draw.line(surface, (0, 200, 0), (graph.left, budget_y), (graph.right - 1, budget_y))
+    step = graph.width / GRAPH_FRAMES
+    points = [(graph.left + int(i * step), graph.bottom - 1 - int(min(t * 1000, GRAPH_MAX_MS) / GRAPH_MAX_MS * (graph.height - 1)))
+              for i, t in enumerate(intervals)]
+    if len(points) > 1:
+        pygame.draw.lines(surface, (255, 200, 0), False, points)
+
+    # 各阶段平均耗时
+    averages = [sum(phases[i] for _, phases in rows) / len(rows) * 1000 for i in range(len(PHASES))]
+    for i, (name, ms) in enumerate(zip(PHASES, averages)):
+        y = graph.bottom + 4 + (i // 2) * 18
+        x = 6 + (i % 2) * (width // 2)
+        surface.blit(font.render(f'{name} {ms:.2f}', True, (220, 220, 220)), (x, y))
+    if profiler.latencies:
+        latencies = sorted(profiler.latencies)
+        text = f'输入延迟 p50 {latencies[len(latencies) // 2] * 1000:.1f}ms  max {latencies[-1] * 1000:.1f}ms'
+        surface.blit(font.render(text, True, (220, 220, 220)), (6, graph.bottom + 4 + 5 * 18))
+    return surface
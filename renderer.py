@@ -0,0 +1,595 @@
+from collections import OrderedDict
+
+import pygame
+
+from assets import display_format
+from effects import EffectSprites, CLEAR_TIME, DEBRIS, fade_level
+from fonts import FontRegistry, TextCache
+from profiler import BACKGROUND, BOARD, PIECE, EFFECTS, HUD, MENU, OVERLAY, FLIP, OVERLAY_REFRESH, build_overlay
+from widgets import ButtonCache, ButtonStyle
+
+# 分层渲染：所有内容都画在固定 300x600 的逻辑画布（game_surface）上，每帧整体缩放一次到窗口中
+# 保持宽高比的 game_area_rect；鼠标坐标用同一变换的逆变换（TetrisGame.to_logical）换算回逻辑坐标。
+# 窗口尺寸只在绘制时读取，拖动窗口产生的一串 VIDEORESIZE 合并为每帧至多一次重新布局
+# 背景图、半透明遮罩和红色边框只合成一次（背景图解码完成时重建）并缓存，
+# 已固定方块、下落方块、HUD 和菜单每帧按层叠加在其上
+# 镜头：格子大小按棋盘列数缩小以放下整行，棋盘高于画布时只绘制视口内的行，视口跟随下落方块滚动，
+# 因此绘制开销与棋盘总行数无关
+# 落点预览（ghost）：下落方块竖直落下后的位置画成轮廓，着陆行由棋盘的列高度索引直接算出；
+# 脏矩形模式：游戏进行中只重绘下落方块上一帧和这一帧所在的区域及落点预览的新旧区域，
+# 用 display.update(rects) 提交；
+# 窗口缩放、状态切换、方块固定/消行（分数变化）时退回整帧重绘，显示性能叠加层时也总是整帧重绘
+# 消行/固定动画（effects.EffectSystem）：消行期间已固定方块层按消行前的布局绘制，闪光和碎片用预先画好的贴图
+# 叠加在方块之上；脏矩形模式下把特效上一帧和这一帧覆盖的范围加入重绘区域
+# 渲染后端在启动时选择（create_renderer）：LayeredRenderer 是软件 Surface 后端；
+# texture_renderer.TextureRenderer 用 pygame._sdl2.video 的 Renderer/Texture 合成。
+# 界面绘制代码只通过 blit / draw_rect / draw_background / draw_board_layer 这几个原语作画，两个后端各自实现
+# OffscreenRenderer 是没有窗口的软件后端，供回放导出（export.py）使用，不在 RENDER_BACKENDS 中
+
+BLOCK_SIZE = 30
+LOGICAL_WIDTH, LOGICAL_HEIGHT = 300, 600
+LOGICAL_SIZE = (LOGICAL_WIDTH, LOGICAL_HEIGHT)
+
+# 按钮样式
+PINK_BUTTON = ButtonStyle((255, 105, 180), (147, 112, 219), 128, (255, 255, 255, 128), 3, 10, (255, 255, 255))
+PAUSE_BUTTON = PINK_BUTTON._replace(border_width=2, border_radius=8)
+MUSIC_ON_BUTTON = PINK_BUTTON._replace(color_start=(0, 100, 0), color_end=(0, 200, 0))
+MUSIC_OFF_BUTTON = PINK_BUTTON._replace(color_start=(100, 0, 0), color_end=(200, 0, 0))
+MENU_BUTTONS = [ButtonStyle(start, end, 128, (255, 255, 255, 200), 2, 15, (255, 255, 255)) for start, end in
+                [((0, 255, 100), (0, 180, 80)), ((255, 200, 0), (200, 160, 0)), ((180, 120, 255), (120, 80, 200)), ((255, 80, 80), (200, 50, 50))]]
+
+# 固定位置的按钮（逻辑画布坐标），绘制和 Games 的点击判定共用
+PAUSE_BTN_RECT = pygame.Rect(LOGICAL_WIDTH - 100, 10, 80, 35)
+START_BTN_RECT = pygame.Rect(LOGICAL_WIDTH//2 - 80, LOGICAL_HEIGHT//2 - 30, 160, 60)
+MUSIC_BTN_RECT = pygame.Rect(LOGICAL_WIDTH//2 - 80, START_BTN_RECT.bottom + 20, 160, 60)
+GAME_OVER_MENU_BTN_RECT = pygame.Rect(LOGICAL_WIDTH//2 - 80, LOGICAL_HEIGHT//2 + 40, 160, 60)
+
+RENDER_BACKENDS = ('surface', 'texture')
+SHAPE_CACHE_SIZE = 64  # 半透明形状精灵图缓存上限
+
+
+def shape_sprite(size, color, width=0, border_radius=0):
+    # 把一个矩形（可带圆角、描边）画成透明底的精灵图，两个后端用它按 alpha 混合半透明形状
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(sprite, color, sprite.get_rect(), width, border_radius=border_radius)
+    return sprite
+
+
+def create_renderer(game, backend='surface', driver=None):
+    # driver 为纹理后端使用的 SDL 渲染驱动名（如 'software'），None 时由 SDL 选择
+    if backend == 'texture':
+        from texture_renderer import TextureRenderer  # pygame._sdl2 只在选择该后端时导入
+        return TextureRenderer(game, driver)
+    if backend == 'offscreen':
+        return OffscreenRenderer(game)
+    return LayeredRenderer(game)
+
+
+class LayeredRenderer:
+    def __init__(self, game, dirty_rects=True):
+        self.game = game
+        self.dirty_rects = dirty_rects
+        self.static_layer = None
+        self.static_key = None
+        self.board_layer = None
+        self.board_key = None
+        self.menu_overlay = None
+        self.frame_key = None
+        self.last_piece_rect = None
+        self.last_ghost_rect = None
+        self.last_effects_rect = None
+        self.effect_sprites = None
+        self.block = BLOCK_SIZE
+        self.visible_rows = 0
+        self.camera_top = 0  # 视口最上方一行在棋盘中的行号
+        self.screen_size = None
+        self.scaled_frame = None  # 缩放到 game_area_rect 尺寸的画面，逻辑尺寸与窗口一致时不使用
+        self.profiler_overlay = None
+        self.profiler_overlay_frame = None
+        self.canvas = None  # 绘制原语的目标表面，默认为 game.game_surface
+        self.shape_sprites = OrderedDict()  # (尺寸, 颜色, 线宽, 圆角) -> 半透明形状精灵图
+        self.fonts = FontRegistry()
+        self.text = TextCache(self.fonts)
+        self.buttons = ButtonCache(self.fonts.get)
+
+    def open_window(self, size):
+        game = self.game
+        game.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        pygame.display.set_caption('马娘消消乐')
+
+    def resize(self, size):
+        self.game.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+
+    def window_size(self):
+        return self.game.screen.get_size()
+
+    def frame_surface(self):
+        # 最近一帧缩放前的 300x600 画面（叠加在黑底上），用于比较后端和离屏导出
+        frame = pygame.Surface(LOGICAL_SIZE)
+        frame.blit(self.game.game_surface, (0, 0))
+        return frame
+
+    def layout(self, screen_size):
+        # 按窗口尺寸计算保持宽高比、居中的 game_area_rect
+        game = self.game
+        screen_width, screen_height = screen_size
+        scale = min(screen_width / LOGICAL_WIDTH, screen_height / LOGICAL_HEIGHT)
+        area_width = max(1, int(LOGICAL_WIDTH * scale))
+        area_height = max(1, int(LOGICAL_HEIGHT * scale))
+        game.game_area_rect = pygame.Rect((screen_width - area_width) // 2, (screen_height - area_height) // 2,
+                                          area_width, area_height)
+        if game.game_area_rect.size == LOGICAL_SIZE:
+            self.scaled_frame = None
+        else:
+            self.scaled_frame = pygame.Surface(game.game_area_rect.size, pygame.SRCALPHA)
+        self.screen_size = screen_size
+        self.frame_key = None
+
+    def build_static_layer(self, size=LOGICAL_SIZE):
+        assets = self.game.assets
+        width, height = size
+        bg_width, bg_height = assets.image('background.jpg').get_size()
+
+        # 计算等比例缩放后的背景尺寸（背景未解码完成时为占位图）
+        scale_ratio = min(width / bg_width, height / bg_height)
+        scaled_bg = assets.scaled('background.jpg', (int(bg_width * scale_ratio), int(bg_height * scale_ratio)))
+
+        layer = pygame.Surface(size, pygame.SRCALPHA)
+        x_offset = (width - scaled_bg.get_width()) // 2
+        y_offset = (height - scaled_bg.get_height()) // 2
+        layer.blit(scaled_bg, (x_offset, y_offset))
+
+        # 半透明遮罩层
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((30, 30, 30, 120))
+        layer.blit(overlay, (0, 0))
+
+        # 红色发光边框
+        border_surface = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(border_surface, (255,0,0,200), (0, 0, width, height), 8)
+        layer.blit(border_surface, (0, 0))
+        # 背景未覆盖的区域带有透明度，因此转换为带 alpha 的显示格式
+        return display_format(layer, alpha=True)
+
+    def get_static_layer(self):
+        game = self.game
+        key = game.assets.version
+        if self.static_layer is None or self.static_key != key:
+            self.static_layer = self.build_static_layer()
+            self.static_key = key
+        return self.static_layer
+
+    def get_menu_overlay(self):
+        # 暂停/结束界面的暗色遮罩
+        if self.menu_overlay is None:
+            self.menu_overlay = pygame.Surface(LOGICAL_SIZE, pygame.SRCALPHA)
+            self.menu_overlay.fill((0, 0, 0, 180))
+        return self.menu_overlay
+
+    def board_layer_key(self):
+        # 已固定方块层只在 merge_to_grid / clear_lines 改变棋盘（board_version 变化）、镜头移动或消行动画开始/结束后重绘
+        game = self.game
+        return game.engine.board_version, self.camera_top, self.block, game.effects.clearing
+
+    def get_board_layer(self):
+        key = self.board_layer_key()
+        if self.board_layer is None or self.board_key != key:
+            if self.board_layer is None:
+                self.board_layer = pygame.Surface(LOGICAL_SIZE, pygame.SRCALPHA)
+            else:
+                self.board_layer.fill((0, 0, 0, 0))
+            self.canvas = self.board_layer
+            self.draw_board()
+            self.canvas = None
+            self.board_key = key
+        return self.board_layer
+
+    def update_camera(self):
+        # 按棋盘尺寸确定格子大小和可见行数，棋盘高于视口时让下落方块保持在视口中间部分
+        game = self.game
+        board = game.engine.board
+        block = self.block = min(BLOCK_SIZE, LOGICAL_WIDTH // board.cols)
+        visible = self.visible_rows = min(board.rows, LOGICAL_HEIGHT // block)
+        top = self.camera_top
+        piece = game.engine.piece
+        if piece is not None and game.game_state == 'playing':
+            y = int(game.current_y)
+            margin = visible // 4
+            if y < top + margin:
+                top = y - margin
+            elif y + piece.height > top + visible - margin:
+                top = y + piece.height - visible + margin
+        self.camera_top = max(0, min(top, board.rows - visible))
+
+    def piece_rect(self):
+        # 当前下落方块在 game_surface 上覆盖的区域
+        game = self.game
+        if game.game_state != 'playing' or not game.current_piece:
+            return None
+        piece = game.engine.piece
+        block = self.block
+        return pygame.Rect(game.current_x * block, (int(game.current_y) - self.camera_top) * block,
+                           piece.width * block + 1, piece.height * block + 1)
+
+    def ghost_rect(self):
+        # 落点预览在 game_surface 上覆盖的区域（消行动画期间不显示）
+        game = self.game
+        if game.game_state != 'playing' or not game.current_piece or game.effects.clearing:
+            return None
+        piece = game.engine.piece
+        block = self.block
+        return pygame.Rect(game.current_x * block, (game.engine.ghost_y() - self.camera_top) * block,
+                           piece.width * block + 1, piece.height * block + 1)
+
+    def effects_rect(self):
+        # 消行闪光和存活粒子在 game_surface 上覆盖的区域
+        game = self.game
+        effects = game.effects
+        block = self.block
+        top = self.camera_top
+        rect = None
+        if effects.clearing:
+            rows = effects.clearing.rows
+            rect = pygame.Rect(0, (rows[0] - top) * block, game.engine.board.cols * block,
+                               (rows[-1] - rows[0] + 1) * block)
+        bounds = effects.pool.bounds
+        if bounds:
+            x0, y0, x1, y1 = bounds
+            particles = pygame.Rect(int(x0 * block), int((y0 - top) * block),
+                                    int((x1 - x0 + 1) * block) + 1, int((y1 - y0 + 1) * block) + 1)
+            rect = particles.union(rect) if rect else particles
+        return rect
+
+    def render(self):
+        game = self.game
+        if self.window_size() != self.screen_size:
+            self.layout(self.window_size())
+
+        self.update_camera()
+        frame_key = (game.game_state, game.engine.board_version, game.score, game.assets.version,
+                     self.camera_top, self.block, game.effects.clearing)
+        piece_rect = self.piece_rect()
+        ghost_rect = self.ghost_rect()
+        effects_rect = self.effects_rect()
+        if (self.dirty_rects and game.game_state == 'playing' and frame_key == self.frame_key
+                and not game.profiler.overlay):
+            # 落点预览总要重画：旋转后外框可能不变（如 T、S/Z 的两种朝向），但轮廓已经不同
+            rects = [self.last_piece_rect, piece_rect, self.last_ghost_rect, ghost_rect]
+            if effects_rect or self.last_effects_rect:
+                rects += [self.last_effects_rect, effects_rect]
+            self.render_regions([rect for rect in rects if rect])
+        else:
+            self.frame_key = frame_key
+            self.render_full()
+        self.last_piece_rect = piece_rect
+        self.last_ghost_rect = ghost_rect
+        self.last_effects_rect = effects_rect
+
+    def render_full(self):
+        game = self.game
+        game.screen.fill((0,0,0))
+        self.draw_layers()
+        game.screen.blit(self.present_frame(), game.game_area_rect)
+        profiler = game.profiler
+        profiler.mark(FLIP)
+        if profiler.overlay:
+            game.screen.blit(self.get_profiler_overlay(), (0, 0))
+            profiler.mark(OVERLAY)
+        self.present()
+        profiler.mark(FLIP)
+
+    def get_profiler_overlay(self):
+        # 统计面板每隔 OVERLAY_REFRESH 帧重绘一次
+        profiler = self.game.profiler
+        if self.profiler_overlay is None or profiler.frames - self.profiler_overlay_frame >= OVERLAY_REFRESH:
+            self.profiler_overlay = build_overlay(profiler, self.fonts.get('simhei', 17))
+            self.profiler_overlay_frame = profiler.frames
+        return self.profiler_overlay
+
+    def present_frame(self):
+        # 逻辑画布整体缩放到 game_area_rect 的尺寸（每帧一次，尺寸一致时直接使用画布）
+        game = self.game
+        if self.scaled_frame is None:
+            return game.game_surface
+        return pygame.transform.scale(game.game_surface, game.game_area_rect.size, self.scaled_frame)
+
+    def to_screen_rect(self, rect):
+        # 逻辑坐标矩形 -> 屏幕矩形（向外取整，覆盖缩放后受影响的全部像素）
+        area = self.game.game_area_rect
+        sx = area.width / LOGICAL_WIDTH
+        sy = area.height / LOGICAL_HEIGHT
+        left = int(rect.left * sx)
+        top = int(rect.top * sy)
+        return pygame.Rect(area.x + left, area.y + top,
+                           -int(-rect.right * sx) - left, -int(-rect.bottom * sy) - top)
+
+    def render_regions(self, rects):
+        # 只重绘给定区域：设置裁剪区后按完整的图层顺序合成，再把这些区域提交到屏幕
+        game = self.game
+        surface = game.game_surface
+        # 相交的区域合并，避免重叠部分重复合成
+        merged = []
+        for rect in rects:
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect = rect.union(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        rects = [rect.clip(surface.get_rect()) for rect in merged]
+        rects = [rect for rect in rects if rect]
+        for rect in rects:
+            surface.set_clip(rect)
+            self.draw_layers()
+        surface.set_clip(None)
+        frame = self.present_frame()
+        screen_rects = []
+        for rect in rects:
+            screen_rect = self.to_screen_rect(rect).clip(game.game_area_rect)
+            game.screen.fill((0,0,0), screen_rect)
+            game.screen.blit(frame, screen_rect, screen_rect.move(-game.game_area_rect.x, -game.game_area_rect.y))
+            screen_rects.append(screen_rect)
+        game.profiler.mark(FLIP)
+        self.present(screen_rects)
+        game.profiler.mark(FLIP)
+
+    def present(self, rects=None):
+        # 把 screen 提交到窗口，rects 为 None 时提交整帧
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    # 绘制原语（软件后端：画在 canvas 上，默认为 game_surface）
+    def blit(self, surface, dest):
+        (self.canvas or self.game.game_surface).blit(surface, dest)
+
+    def draw_rect(self, color, rect, width=0, border_radius=0):
+        target = self.canvas or self.game.game_surface
+        if len(color) == 3 or color[3] == 255:
+            pygame.draw.rect(target, color, rect, width, border_radius=border_radius)
+            return
+        # 半透明形状：draw.rect 会连同 alpha 一起覆盖底下的像素，先画成精灵图再按 alpha 混合（与纹理后端一致）
+        rect = pygame.Rect(rect)
+        if rect.width > 0 and rect.height > 0:
+            target.blit(self.shape_sprite(rect.size, color, width, border_radius), rect)
+
+    def shape_sprite(self, size, color, width, border_radius):
+        key = (size, tuple(color), width, border_radius)
+        sprite = self.shape_sprites.get(key)
+        if sprite is not None:
+            self.shape_sprites.move_to_end(key)
+            return sprite
+        sprite = self.shape_sprites[key] = shape_sprite(size, color, width, border_radius)
+        if len(self.shape_sprites) > SHAPE_CACHE_SIZE:
+            self.shape_sprites.popitem(last=False)
+        return sprite
+
+    def draw_background(self):
+        # 清空后以 MAX 混合拷贝静态层，像素与逐帧合成的结果完全一致
+        surface = self.game.game_surface
+        surface.fill((0,0,0,0))
+        surface.blit(self.get_static_layer(), (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+
+    def draw_board_layer(self):
+        self.game.game_surface.blit(self.get_board_layer(), (0, 0))
+
+    def draw_button(self, rect, style, text, font_spec):
+        self.blit(self.buttons.get((rect.width, rect.height), style, text, font_spec), rect.topleft)
+
+    def draw_layers(self):
+        game = self.game
+        profiler = game.profiler
+        self.draw_background()
+        profiler.mark(BACKGROUND)
+
+        self.draw_board_layer()
+        profiler.mark(BOARD)
+        if game.game_state == 'playing' and game.current_piece:
+            if not game.effects.clearing:
+                self.draw_ghost()
+            self.draw_piece()
+            profiler.mark(PIECE)
+        if game.effects.active:
+            self.draw_effects()
+            profiler.mark(EFFECTS)
+        if game.game_state == 'playing':
+            self.draw_hud()
+        elif game.game_state == 'paused':
+            self.draw_pause_menu()
+        elif game.game_state == 'game_over':
+            self.draw_game_over()
+        elif game.game_state == 'start_menu':
+            self.draw_start_menu()
+        profiler.mark(HUD if game.game_state == 'playing' else MENU)
+        self.draw_footer()
+        profiler.mark(HUD)
+
+    def draw_board(self):
+        # 已固定的方块层（使用更醒目的颜色），只遍历视口内的行
+        game = self.game
+        block = self.block
+        top = self.camera_top
+        bottom = top + self.visible_rows
+        clearing = game.effects.clearing
+        if clearing:
+            self.draw_clearing_board(clearing, top, bottom)
+            return
+        for x, y, color in game.engine.board.iter_cells(top, bottom):
+            self.draw_rect(color, (x * block, (y - top) * block, block-2, block-2))
+
+    def draw_clearing_board(self, clearing, top, bottom):
+        # 消行动画期间按消行前的布局绘制：消行后棋盘的每一行放回原来的行号，再补上被消掉的行
+        game = self.game
+        block = self.block
+        for x, y, color in game.engine.board.iter_cells(top, bottom + len(clearing.rows)):
+            y = clearing.row_before(y)
+            if top <= y < bottom:
+                self.draw_rect(color, (x * block, (y - top) * block, block-2, block-2))
+        for x, y, color in clearing.cells:
+            if top <= y < bottom:
+                self.draw_rect(color, (x * block, (y - top) * block, block-2, block-2))
+
+    def get_effect_sprites(self):
+        block = self.block
+        cols = self.game.engine.board.cols
+        if self.effect_sprites is None or self.effect_sprites.key != (block, cols):
+            self.effect_sprites = EffectSprites(block, cols)
+        return self.effect_sprites
+
+    def draw_effects(self):
+        # 消行闪光在满行原来的位置上淡出，固定闪光和碎片按各自的年龄取对应透明度的贴图
+        game = self.game
+        effects = game.effects
+        sprites = self.get_effect_sprites()
+        block = self.block
+        top = self.camera_top
+        clearing = effects.clearing
+        if clearing:
+            flash = sprites.flash[fade_level(clearing.age, CLEAR_TIME)]
+            for y in clearing.rows:
+                if top <= y < top + self.visible_rows:
+                    self.blit(flash, (0, (y - top) * block))
+        pool = effects.pool
+        items = pool.items
+        for i in range(pool.live):
+            p = items[i]
+            level = fade_level(p.age, p.ttl)
+            if p.kind == DEBRIS:
+                self.blit(sprites.debris_frames(p.color)[level], (int(p.x * block), int((p.y - top) * block)))
+            else:
+                self.blit(sprites.lock[level], (int(p.x * block) + 1, int((p.y - top) * block) + 1))
+
+    def draw_ghost(self):
+        # 落点预览：与下落方块同色的轮廓，先于方块绘制，两者重合时被方块盖住
+        game = self.game
+        block = self.block
+        ghost_y = game.engine.ghost_y()
+        for dx, dy in game.engine.piece.offsets:
+            block_x = (game.current_x + dx) * block + 1
+            block_y = (ghost_y + dy - self.camera_top) * block + 1
+            self.draw_rect(game.current_color, (block_x, block_y, block-1, block-1), 2)
+
+    def draw_piece(self):
+        # 当前下落方块层（在遮罩层之后）
+        game = self.game
+        block = self.block
+        for y, row in enumerate(game.current_piece):
+            for x, val in enumerate(row):
+                if val:
+                    # 计算相对于游戏区域（视口）的坐标偏移
+                    block_x = (game.current_x + x) * block + 1
+                    block_y = (int(game.current_y) + y - self.camera_top) * block + 1
+                    self.draw_rect(game.current_color, (block_x, block_y, block-1, block-1))
+
+    def draw_hud(self):
+        # 游戏中的分数和暂停按钮
+        game = self.game
+        # 添加暂停按钮
+        self.draw_button(PAUSE_BTN_RECT, PAUSE_BUTTON, '暂停', ('kaiti', 24))
+
+        score_text = self.text.render(('simhei', 24), f'分数: {game.score}', (255, 255, 255))
+        self.blit(score_text, (10, 10))
+
+    def draw_pause_menu(self):
+        # 暂停菜单
+        game = self.game
+        self.blit(self.get_menu_overlay(), (0, 0))
+        
+        # 绘制暂停标题
+        pause_title = self.text.render(('kaiti', 32), '游戏暂停', (255, 255, 255))
+        title_rect = pause_title.get_rect(center=(LOGICAL_WIDTH//2, LOGICAL_HEIGHT//2 - 120))
+        self.blit(pause_title, title_rect)
+        
+        # 绘制按钮
+        btn_width, btn_height = 160, 60
+        btn_x = LOGICAL_WIDTH//2 - btn_width//2
+        btn_y_offsets = [-100, -20, 60, 140]  # 调整按钮位置
+        btn_texts = ['继续游戏', '重新开始', '返回主菜单', '退出游戏']
+        for i, (text, style) in enumerate(zip(btn_texts, MENU_BUTTONS)):
+            btn_rect = pygame.Rect(btn_x, LOGICAL_HEIGHT//2 + btn_y_offsets[i], btn_width, btn_height)
+            self.draw_button(btn_rect, style, text, ('kaiti', 32))
+            if i == 0:
+                game.continue_btn = btn_rect
+            elif i == 1:
+                game.restart_btn = btn_rect
+            elif i == 2:
+                game.main_menu_btn = btn_rect
+            elif i == 3:
+                game.quit_btn = btn_rect
+        
+        # 优化音量控制条
+        game.volume_rect = pygame.Rect(btn_x, LOGICAL_HEIGHT//2 + 220, btn_width, 25)
+        self.draw_rect((50, 50, 50, 180), game.volume_rect, border_radius=12)
+        fill_width = int(game.bg_volume * game.volume_rect.width)
+        self.draw_rect((0, 255, 100, 180), (game.volume_rect.x, game.volume_rect.y, fill_width, 25), border_radius=12)
+        self.draw_rect((255, 255, 255, 200), game.volume_rect, 2, border_radius=12)
+        volume_text = self.text.render(('simhei', 20), f'音量: {int(game.bg_volume*100)}%', (255, 255, 255))
+        self.blit(volume_text, (game.volume_rect.x, game.volume_rect.y - 30))
+
+    def draw_game_over(self):
+        # 游戏结束界面
+        game = self.game
+        self.blit(self.get_menu_overlay(), (0, 0))
+        
+        # 返回主菜单按钮
+        self.draw_button(GAME_OVER_MENU_BTN_RECT, MENU_BUTTONS[0], '返回主菜单', ('simhei', 24))
+        
+        # 游戏结束文本
+        game_over_text = self.text.render(('simhei', 24), '游戏结束！', (255, 0, 0))
+        score_text = self.text.render(('simhei', 24), f'最终分数: {game.score}', (255, 255, 255))
+        text_rect = game_over_text.get_rect(center=(LOGICAL_WIDTH//2, LOGICAL_HEIGHT//2 - 30))
+        self.blit(game_over_text, text_rect)
+        score_rect = score_text.get_rect(center=(LOGICAL_WIDTH//2, LOGICAL_HEIGHT//2 + 10))
+        self.blit(score_text, score_rect)
+
+    def draw_start_menu(self):
+        # 开始菜单
+        game = self.game
+        # 绘制游戏标题
+        # 绘制下方阴影
+        shadow_text = self.text.render(('kaiti', 40), '马娘消消乐', (60, 60, 60))  # 深灰色阴影
+        shadow_y = 55  # 调整阴影垂直偏移量
+        shadow_rect = shadow_text.get_rect(center=(LOGICAL_WIDTH//2, shadow_y))
+        self.blit(shadow_text, shadow_rect)
+        # 绘制主体文字
+        title_text = self.text.render(('kaiti', 40), '马娘消消乐', (255,192,203))
+        title_rect = title_text.get_rect(center=(LOGICAL_WIDTH//2, 50))
+        self.blit(title_text, title_rect)
+        
+        # 粉紫渐变开始按钮
+        self.draw_button(START_BTN_RECT, PINK_BUTTON, '开始游戏', ('kaiti', 28))
+        # 音乐开关按钮（开/关状态对应不同的缓存图）
+        music_style = MUSIC_ON_BUTTON if game.music_playing else MUSIC_OFF_BUTTON
+        music_label = '音乐: 开' if game.music_playing else '音乐: 关'
+        self.draw_button(MUSIC_BTN_RECT, music_style, music_label, ('kaiti', 28))
+        game.volume_rect = pygame.Rect(LOGICAL_WIDTH//2 - 100, MUSIC_BTN_RECT.bottom + 20, 200, 20)
+        self.draw_rect((50, 50, 50), game.volume_rect, border_radius=10)
+        fill_width = int(game.bg_volume * game.volume_rect.width)
+        self.draw_rect((0, 200, 0), (game.volume_rect.x, game.volume_rect.y, fill_width, 20), border_radius=10)
+        self.draw_rect((255, 255, 255), game.volume_rect, 2, border_radius=10)
+        volume_text = self.text.render(('kaiti', 20), f'音量: {int(game.bg_volume*100)}%', (255,255,255))
+        self.blit(volume_text, (game.volume_rect.x, game.volume_rect.y - 25))
+        music_name_line1 = self.text.render(('simhei', 17), '当前正在播放的音乐为：', (255,255,255))
+        music_name_line2 = self.text.render(('simhei', 17), 'winning the soul--Machico', (255,255,255))
+        line1_rect = music_name_line1.get_rect(centerx=LOGICAL_WIDTH//2, top=game.volume_rect.bottom + 20)
+        line2_rect = music_name_line2.get_rect(centerx=LOGICAL_WIDTH//2, top=line1_rect.bottom + 10)
+        self.blit(music_name_line1, line1_rect)
+        self.blit(music_name_line2, line2_rect)
+
+    def draw_footer(self):
+        # 版本信息
+        version_text = self.text.render(('simhei', 17), '版本：1.0          作者：721K(皓)', (255, 255, 255))
+        self.blit(version_text, (10, LOGICAL_HEIGHT - 20))
+
+
+class OffscreenRenderer(LayeredRenderer):
+    # screen 是普通的不透明表面：画面照常合成（含脏矩形和缩放）到 screen 上，但不提交到任何窗口，
+    # 调用方在 render() 之后直接读取 screen 的像素
+    def open_window(self, size):
+        self.game.screen = pygame.Surface(size)
+
+    def resize(self, size):
+        self.open_window(size)
+
+    def present(self, rects=None):
+        pass
@@ -0,0 +1,194 @@
+import argparse
+import os
+import struct
+import time
+import zlib
+
+from engine import TetrisEngine, Board, ACTIONS, ACTION_CODES
+
+# 对局回放：记录 (模拟帧号, 输入) 对的紧凑二进制日志，配合每局的随机种子即可完全复现一局。
+# 可以无窗口全速重新模拟（用作性能回归负载、校验优化后的引擎结果逐位一致），也可以 1x/4x/16x 渲染播放
+#
+# 文件格式（小端）：
+#   头部   b'TRPL' 版本(u8) 种子(u64) 列数(u16) 行数(u16) 模拟步长(f64)
+#   记录   帧号增量(varint) 动作编码(u8)，编码为 engine.ACTIONS 的下标，SPAWN 表示前端调用了 spawn_new_piece
+#   结尾   END(u8) 帧号增量(varint) 最终分数(varint) 棋盘摘要(u32)
+
+MAGIC = b'TRPL'
+VERSION = 1
+HEADER = struct.Struct('<4sBQHHd')
+SPAWN = 0xFE
+END = 0xFF
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def board_digest(engine):
+    # 已固定方块（含颜色）的 CRC32，用于校验两次模拟结果是否一致
+    data = bytearray()
+    for x, y, color in sorted(engine.board.iter_cells()):
+        data += struct.pack('<HH3B', x, y, *color)
+    return zlib.crc32(bytes(data))
+
+
+class ReplayRecorder:
+    def __init__(self, seed, cols, rows, dt):
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, seed, cols, rows, dt))
+        self.last_tick = 0
+        self.finished = False
+
+    def _record(self, tick, code):
+        write_varint(self.data, tick - self.last_tick)
+        self.data.append(code)
+        self.last_tick = tick
+
+    def record(self, tick, action):
+        self._record(tick, ACTION_CODES[action])
+
+    def record_spawn(self, tick):
+        self._record(tick, SPAWN)
+
+    def finish(self, engine, tick):
+        if not self.finished:
+            self.data.append(END)
+            write_varint(self.data, tick - self.last_tick)
+            write_varint(self.data, engine.score)
+            self.data += struct.pack('<I', board_digest(engine))
+            self.finished = True
+        return bytes(self.data)
+
+    def save(self, path, engine, tick):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.finish(engine, tick))
+        return path
+
+
+class Replay:
+    def __init__(self, seed, cols, rows, dt, events, end_tick=None, score=None, digest=None):
+        self.seed = seed
+        self.cols = cols
+        self.rows = rows
+        self.dt = dt
+        self.events = events  # [(tick, code)]，按帧号排序
+        self.end_tick = end_tick if end_tick is not None else (events[-1][0] + 1 if events else 0)
+        self.score = score
+        self.digest = digest
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, cols, rows, dt = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('不是有效的回放文件')
+        pos = HEADER.size
+        tick = 0
+        events = []
+        while pos < len(data):
+            if data[pos] == END:
+                delta, pos = read_varint(data, pos + 1)
+                score, pos = read_varint(data, pos)
+                digest, = struct.unpack_from('<I', data, pos)
+                return cls(seed, cols, rows, dt, events, tick + delta, score, digest)
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            events.append((tick, data[pos]))
+            pos += 1
+        return cls(seed, cols, rows, dt, events)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def ticks(self):
+        # 逐帧产出 (帧号, 是否出块, 动作列表)
+        events = self.events
+        i = 0
+        for tick in range(self.end_tick):
+            spawn = False
+            actions = []
+            while i < len(events) and events[i][0] == tick:
+                code = events[i][1]
+                if code == SPAWN:
+                    spawn = True
+                elif code:
+                    actions.append(ACTIONS[code])
+                i += 1
+            yield tick, spawn, actions
+
+
+def simulate(replay, board=None):
+    # 无窗口、不限速地重新模拟整局，返回引擎；board 需与录制时的尺寸一致，默认按文件头创建
+    if board is None:
+        board = Board(replay.cols, replay.rows)
+    engine = TetrisEngine(board=board, seed=replay.seed)
+    for tick, spawn, actions in replay.ticks():
+        if spawn:
+            engine.spawn_new_piece()
+        engine.step(actions, replay.dt)
+    return engine
+
+
+def verify(replay, board=None):
+    # 重新模拟并与录制时的最终分数、棋盘摘要比较
+    engine = simulate(replay, board)
+    return engine.score == replay.score and board_digest(engine) == replay.digest
+
+
+def play(replay, speed=1):
+    # 渲染播放，speed 为每个渲染帧推进的模拟帧数（1x/4x/16x）
+    import pygame
+    from Games import TetrisGame, FPS
+
+    game = TetrisGame(board_size=(replay.cols, replay.rows))
+    game.engine = TetrisEngine(board=Board(replay.cols, replay.rows), seed=replay.seed)
+    game.game_state = 'playing'
+    for tick, spawn, actions in replay.ticks():
+        if spawn:
+            game.engine.spawn_new_piece()
+        game.effects.step(game.engine, game.engine.step(actions, replay.dt), replay.dt)
+        if tick % speed == 0:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return game.engine
+            game.render()
+            game.clock.tick(FPS)
+    game.game_state = 'game_over'
+    game.render()
+    return game.engine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='对局回放：校验、全速重新模拟或渲染播放')
+    parser.add_argument('path')
+    parser.add_argument('--play', type=int, choices=(1, 4, 16), help='以 1x/4x/16x 速度渲染播放')
+    parser.add_argument('--repeat', type=int, default=1, help='全速重复模拟次数（性能回归负载）')
+    args = parser.parse_args()
+    replay = Replay.load(args.path)
+    if args.play:
+        play(replay, args.play)
+    else:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            engine = simulate(replay)
+        elapsed = time.perf_counter() - start
+        ok = engine.score == replay.score and board_digest(engine) == replay.digest
+        print(f'种子 {replay.seed}  {replay.end_tick} 帧  分数 {engine.score}  '
+              f'{"一致" if ok else "不一致"}  {replay.end_tick * args.repeat / elapsed:,.0f} 帧/秒')
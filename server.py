@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import os
+import struct
+import time
+from collections import deque
+
+from bitboard import BitBoard
+from engine import TetrisEngine, COLORS, ACTIONS, SIM_DT
+from replay import ReplayRecorder, board_digest
+
+# 对局服务器：一个进程内用 asyncio 承载大量无窗口对局，玩家输入只在服务器上生效（联机对战、排行榜校验）。
+# 所有会话由同一个调度任务按固定步长推进，规则与单机版相同（TetrisEngine 的 spawn_new_piece / update /
+# clear_lines 计分）；每局都录成回放，结束时可写入目录，用 python replay.py <文件> 校验。
+# 客户端通过本地套接字（TCP 或 Unix 域套接字）收发紧凑的二进制消息：上行输入批次，下行状态增量。
+# 一个连接可以承载多个会话；每一帧推进完全部会话后，每个连接的全部增量合并为一次写入
+#
+# 消息格式（小端）：长度(u16，类型+负载的字节数) 类型(u8) 负载
+#   客户端 -> 服务器
+#     JOIN    令牌(u32) 种子(u64，0 表示由服务器选择) 列数(u16) 行数(u16)
+#     INPUT   会话(u32) 目标帧号(u32) 动作编码(u8)*，编码为 engine.ACTIONS 的下标；目标帧已过时在下一帧生效
+#     LEAVE   会话(u32)
+#     STATS   （无负载）返回自上次 STATS 以来的调度统计
+#   服务器 -> 客户端
+#     JOINED  令牌(u32) 会话(u32，0 表示拒绝) 种子(u64)
+#     DELTA   会话(u32) 帧号(u32) 标志(u8)，随后按标志位依次附加：
+#               PIECE      形状(u8，无方块时为 0xFF) 旋转(u8) x(i16) y(u16) 颜色(u8，engine.COLORS 的下标)
+#               SCORE      分数(u32)
+#               ROWS       行数(u16) 各行 [行号(u16) 占用位掩码(u64)]
+#               GAME_OVER  棋盘摘要(u32，与 replay.board_digest 相同)，会话随即结束
+#             状态没有变化的帧不发送；应用了输入的帧总是发送，作为输入确认（标志可以为 0）
+#     STATS   会话数(u32) 已推进帧数(u32) 跳过帧数(u32) 帧延迟 p50/p95/p99/max(f64 毫秒) CPU 占用比例(f64)
+#             帧延迟 = 该帧推进并发出增量的时刻 - 该帧的计划时刻
+
+HEADER = struct.Struct('<HB')
+JOIN, INPUT, LEAVE, STATS = 1, 2, 3, 4
+JOINED, DELTA, STATS_REPLY = 0x81, 0x82, 0x83
+
+JOIN_MSG = struct.Struct('<IQHH')
+INPUT_MSG = struct.Struct('<II')
+SESSION_MSG = struct.Struct('<I')
+JOINED_MSG = struct.Struct('<IIQ')
+DELTA_MSG = struct.Struct('<IIB')
+PIECE_FIELD = struct.Struct('<BBhHB')
+SCORE_FIELD = struct.Struct('<I')
+ROW_COUNT = struct.Struct('<H')
+ROW_FIELD = struct.Struct('<HQ')
+DIGEST_FIELD = struct.Struct('<I')
+STATS_MSG = struct.Struct('<IIIddddd')
+
+F_PIECE, F_SCORE, F_ROWS, F_GAME_OVER = 1, 2, 4, 8
+NO_PIECE = 0xFF
+
+MAX_BEHIND_TICKS = 5         # 落后超过这么多帧时放弃追赶
+MAX_COLS = 64                # 行掩码按 u64 传输
+MAX_ROWS = 4096
+WRITE_BUFFER_LIMIT = 1 << 20  # 客户端长时间不读取、发送缓冲超过此值时断开
+READ_CHUNK = 65536
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+
+def pack_message(kind, payload=b''):
+    return HEADER.pack(len(payload) + 1, kind) + payload
+
+
+async def read_messages(reader):
+    # 按块读取并拆分消息，产出 (类型, 负载)；连接关闭时结束
+    buffer = bytearray()
+    while True:
+        chunk = await reader.read(READ_CHUNK)
+        if not chunk:
+            return
+        buffer += chunk
+        pos = 0
+        while len(buffer) - pos >= HEADER.size:
+            length, kind = HEADER.unpack_from(buffer, pos)
+            if length == 0:
+                raise ValueError('消息长度为 0')
+            end = pos + 2 + length
+            if end > len(buffer):
+                break
+            yield kind, bytes(buffer[pos + HEADER.size:end])
+            pos = end
+        del buffer[:pos]
+
+
+class Session:
+    def __init__(self, session_id, conn, seed, cols, rows):
+        self.id = session_id
+        self.conn = conn
+        self.engine = TetrisEngine(board=BitBoard(cols, rows), seed=seed)
+        self.recorder = ReplayRecorder(self.engine.seed, cols, rows, SIM_DT)
+        self.tick = 0
+        self.inputs = []  # [(目标帧号, [动作])]，按到达顺序
+        self.sent_piece = None
+        self.sent_score = 0
+        self.sent_version = self.engine.board_version
+        self.sent_rows = [0] * rows
+        self.recorder.record_spawn(0)
+        self.engine.spawn_new_piece()
+
+    def step(self):
+        # 推进一帧，返回这一帧的 DELTA 消息（无变化且没有输入时为 None）
+        tick = self.tick
+        actions = []
+        acked = False
+        if self.inputs:
+            pending = []
+            for target, batch in self.inputs:
+                if target <= tick:
+                    actions += batch
+                else:
+                    pending.append((target, batch))
+            acked = len(pending) < len(self.inputs)
+            self.inputs = pending
+            for action in actions:
+                self.recorder.record(tick, action)
+        self.engine.step(actions, SIM_DT)
+        self.tick += 1
+        return self.delta(tick, acked)
+
+    def delta(self, tick, force):
+        engine = self.engine
+        flags = 0
+        fields = []
+        piece = engine.piece
+        y = int(engine.current_y)
+        state = (piece, engine.current_x, y, engine.current_color)
+        if state != self.sent_piece:
+            self.sent_piece = state
+            flags |= F_PIECE
+            if piece is None:
+                fields.append(PIECE_FIELD.pack(NO_PIECE, 0, 0, 0, 0))
+            else:
+                fields.append(PIECE_FIELD.pack(piece.shape_id, piece.rotation, engine.current_x, y,
+                                               COLOR_INDEX[engine.current_color]))
+        if engine.score != self.sent_score:
+            self.sent_score = engine.score
+            flags |= F_SCORE
+            fields.append(SCORE_FIELD.pack(engine.score))
+        if engine.board_version != self.sent_version:
+            # 棋盘变化时只发送与上次不同的行
+            self.sent_version = engine.board_version
+            rows = engine.board.occupancy()
+            sent = self.sent_rows
+            changed = [y for y in range(len(rows)) if rows[y] != sent[y]]
+            if changed:
+                flags |= F_ROWS
+                fields.append(ROW_COUNT.pack(len(changed)))
+                fields.extend(ROW_FIELD.pack(y, rows[y]) for y in changed)
+            self.sent_rows = rows
+        if engine.game_over:
+            flags |= F_GAME_OVER
+            fields.append(DIGEST_FIELD.pack(board_digest(engine)))
+        if not flags and not force:
+            return None
+        return pack_message(DELTA, DELTA_MSG.pack(self.id, tick, flags) + b''.join(fields))
+
+
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.out = bytearray()  # 本帧待发送的消息
+        self.sessions = set()
+
+    def flush(self):
+        if not self.out or self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+            print(f'[SERVER] 客户端未读取数据，断开连接 {self.writer.get_extra_info("peername")}')
+            self.writer.close()
+            return
+        self.writer.write(bytes(self.out))
+        self.out.clear()
+
+
+class SessionServer:
+    def __init__(self, replay_dir=None, window=3600):
+        self.replay_dir = replay_dir
+        self.sessions = {}
+        self.connections = set()
+        self.next_id = 1
+        self.ticks = 0
+        self.skipped = 0
+        self.latencies = deque(maxlen=window)
+        self.stats_since = (time.perf_counter(), time.process_time())
+
+    async def handle_connection(self, reader, writer):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        try:
+            async for kind, payload in read_messages(reader):
+                self.handle_message(conn, kind, payload)
+        except ConnectionError:
+            pass
+        except (ValueError, struct.error) as e:
+            print(f'[SERVER] 协议错误，断开连接: {e}')
+        finally:
+            for session_id in list(conn.sessions):
+                self.end_session(self.sessions[session_id])
+            self.connections.discard(conn)
+            writer.close()
+
+    def handle_message(self, conn, kind, payload):
+        if kind == INPUT:
+            session_id, target = INPUT_MSG.unpack_from(payload)
+            session = self.sessions.get(session_id)
+            if session is None or session.conn is not conn:
+                return  # 已结束或不属于该连接的会话
+            codes = payload[INPUT_MSG.size:]
+            session.inputs.append((target, [ACTIONS[code] for code in codes if 0 < code < len(ACTIONS)]))
+        elif kind == JOIN:
+            token, seed, cols, rows = JOIN_MSG.unpack(payload)
+            if not (4 <= cols <= MAX_COLS and 4 <= rows <= MAX_ROWS):
+                conn.out += pack_message(JOINED, JOINED_MSG.pack(token, 0, 0))
+                return
+            session = Session(self.next_id, conn, seed or None, cols, rows)
+            self.next_id += 1
+            self.sessions[session.id] = session
+            conn.sessions.add(session.id)
+            conn.out += pack_message(JOINED, JOINED_MSG.pack(token, session.id, session.engine.seed))
+        elif kind == LEAVE:
+            session_id, = SESSION_MSG.unpack(payload)
+            session = self.sessions.get(session_id)
+            if session is not None and session.conn is conn:
+                self.end_session(session)
+        elif kind == STATS:
+            conn.out += pack_message(STATS_REPLY, self.stats())
+        else:
+            raise ValueError(f'未知的消息类型 {kind}')
+
+    def end_session(self, session):
+        # 正常结束的对局保存回放，中途离开的直接丢弃
+        del self.sessions[session.id]
+        session.conn.sessions.discard(session.id)
+        if self.replay_dir and session.engine.game_over:
+            path = os.path.join(self.replay_dir, f'{session.id}-{session.engine.seed}.trpl')
+            session.recorder.save(path, session.engine, session.tick)
+
+    def tick_all(self):
+        finished = []
+        for session in self.sessions.values():
+            message = session.step()
+            if message is not None:
+                session.conn.out += message
+            if session.engine.game_over:
+                finished.append(session)
+        for session in finished:
+            self.end_session(session)
+        for conn in self.connections:
+            conn.flush()
+        self.ticks += 1
+
+    async def run(self):
+        # 共享调度器：按固定步长推进全部会话；每帧之间让出事件循环处理网络读写
+        next_tick = time.perf_counter()
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+            self.tick_all()
+            now = time.perf_counter()
+            self.latencies.append(now - next_tick)
+            next_tick += SIM_DT
+            behind = int((now - next_tick) / SIM_DT)
+            if behind > MAX_BEHIND_TICKS:
+                self.skipped += behind
+                next_tick = now
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def pick(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+        now, cpu = time.perf_counter(), time.process_time()
+        wall = now - self.stats_since[0]
+        cpu_share = (cpu - self.stats_since[1]) / wall if wall > 0 else 0.0
+        self.stats_since = (now, cpu)
+        self.latencies.clear()
+        return STATS_MSG.pack(len(self.sessions), self.ticks, self.skipped,
+                              pick(0.50), pick(0.95), pick(0.99), latencies[-1] * 1000 if latencies else 0.0,
+                              cpu_share)
+
+
+async def serve(server, host='127.0.0.1', port=7721, unix_path=None):
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle_connection, unix_path)
+        where = unix_path
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+        where = '%s:%d' % listener.sockets[0].getsockname()[:2]
+    print(f'对局服务器已启动: {where}', flush=True)
+    ticker = asyncio.create_task(server.run())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        ticker.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='无窗口对局服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7721)
+    parser.add_argument('--unix', help='改为监听 Unix 域套接字路径')
+    parser.add_argument('--replays', help='正常结束的对局回放保存目录')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(SessionServer(args.replays), args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
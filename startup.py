@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from Games import STARTUP_PROBE_ENV
+
+# 启动时间基准：反复启动游戏进程（源码方式或打包好的可执行文件），测量从创建进程到第一帧上屏的时间。
+# 子进程通过 TETRIS_STARTUP_PROBE 环境变量拿到一个文件路径，第一帧画完后写入“模块导入完成”和“第一帧”的
+# 时间戳后立即退出（见 Games.after_first_frame），据此把启动时间拆成 解释器启动+导入 和 初始化+首帧 两段。
+# 第一次启动只用来预热磁盘缓存，不计入结果。结果保存为 JSON，可与之前的结果比较，变慢时以非零状态退出
+#
+#   python startup.py --out new.json
+#   python startup.py --exe dist/马娘消消乐/马娘消消乐 --compare old.json
+#   python startup.py --exe dist/马娘消消乐.exe      # 对照单文件版本每次启动的解包开销
+
+PHASES = ('imported', 'first_frame')
+TIMEOUT = 60
+LAUNCH_ENV = dict(os.environ)  # 导入 bench 会把 SDL 驱动默认设为 dummy，启动游戏用导入之前的环境
+
+
+def launch(command, env, probe):
+    # 返回 {阶段: 从创建进程起的毫秒数}
+    if os.path.exists(probe):
+        os.remove(probe)
+    start = time.time()
+    subprocess.run(command, env=env, timeout=TIMEOUT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(probe, encoding='utf-8') as f:
+        stamps = [float(value) for value in f.read().split()]
+    return {phase: (stamp - start) * 1e3 for phase, stamp in zip(PHASES, stamps)}
+
+
+def run(command, runs=10, headless=False):
+    from bench import percentiles
+
+    env = dict(LAUNCH_ENV)
+    if headless:
+        env['SDL_VIDEODRIVER'] = 'dummy'
+        env['SDL_AUDIODRIVER'] = 'dummy'
+    with tempfile.TemporaryDirectory() as tmp:
+        env[STARTUP_PROBE_ENV] = probe = os.path.join(tmp, 'probe.txt')
+        launch(command, env, probe)
+        samples = [launch(command, env, probe) for _ in range(runs)]
+    results = {phase: percentiles([sample[phase] for sample in samples]) for phase in PHASES}
+    for phase in PHASES:
+        results[phase]['min'] = min(sample[phase] for sample in samples)
+    return results
+
+
+def compare(old, new, threshold):
+    # 返回 p50 变慢超过 threshold 比例的阶段
+    regressions = []
+    for phase, result in new['startup'].items():
+        base = old.get('startup', {}).get(phase)
+        if base and result['p50'] > base['p50'] * (1 + threshold):
+            regressions.append((phase, base['p50'], result['p50']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='启动到第一帧的时间')
+    parser.add_argument('--exe', help='打包好的可执行文件，默认用当前解释器运行 Games.py')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--headless', action='store_true', help='使用 SDL dummy 视频/音频驱动（无显示器的 CI）')
+    parser.add_argument('--out', help='结果 JSON 输出路径')
+    parser.add_argument('--compare', help='与之比较的结果 JSON')
+    parser.add_argument('--threshold', type=float, default=0.10, help='判定为变慢的 p50 增幅比例')
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(here, 'Games.py')]
+    from bench import meta
+    results = {'meta': dict(meta('surface'), command=command, runs=args.runs),
+               'startup': run(command, args.runs, args.headless)}
+    for phase, r in results['startup'].items():
+        print(f'{phase:12s} min {r["min"]:8.1f}ms  p50 {r["p50"]:8.1f}ms  p95 {r["p95"]:8.1f}ms')
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        regressions = compare(old, results, args.threshold)
+        for phase, before, after in regressions:
+            print(f'变慢: {phase}  {before:.1f} -> {after:.1f} (+{(after / before - 1) * 100:.0f}%)')
+        if regressions:
+            sys.exit(1)
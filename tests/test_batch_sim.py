@@ -0,0 +1,10 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from batch_sim import differential_check
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_batch_engine_matches_scalar_engine(seed):
+    assert differential_check(n=16, steps=500, seed=seed) is None
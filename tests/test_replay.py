@@ -0,0 +1,37 @@
+import pytest
+
+from ai import AutoPlayer
+from bitboard import BitBoard
+from engine import TetrisEngine, Board, SIM_DT, COLS, ROWS
+from replay import Replay, ReplayRecorder, verify
+
+
+def record_game(seed, ticks=1500):
+    # 与 Games 一样在出块和每个输入时记录，返回序列化再读回的回放
+    engine = TetrisEngine(board=Board(), seed=seed)
+    recorder = ReplayRecorder(seed, COLS, ROWS, SIM_DT)
+    recorder.record_spawn(0)
+    engine.spawn_new_piece()
+    player = AutoPlayer()
+    for tick in range(ticks):
+        actions = player.next_actions(engine)
+        for action in actions:
+            recorder.record(tick, action)
+        engine.step(actions, SIM_DT)
+        if engine.game_over:
+            break
+    return Replay.from_bytes(bytes(recorder.finish(engine, tick + 1)))
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_replay_reproduces_game(seed):
+    replay = record_game(seed)
+    assert replay.score > 0
+    assert verify(replay)
+    assert verify(replay, BitBoard(replay.cols, replay.rows))
+
+
+def test_verify_detects_mismatch():
+    replay = record_game(1)
+    replay.score += 1
+    assert not verify(replay)
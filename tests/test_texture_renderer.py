@@ -0,0 +1,12 @@
+import pytest
+
+pytest.importorskip('pygame._sdl2.video')
+
+from texture_renderer import MAX_CHANNEL_DIFF, differential_check
+
+
+@pytest.mark.parametrize('seed', [7, 11])
+def test_texture_backend_matches_surface_backend(seed, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # TetrisGame 在当前目录写 error.log
+    for state, (worst, mean) in differential_check(steps=100, seed=seed).items():
+        assert worst <= MAX_CHANNEL_DIFF, state
@@ -0,0 +1,54 @@
+# PyInstaller 打包配置。默认生成快速启动的 onedir 布局（dist/马娘消消乐/ 目录）：程序和依赖直接放在磁盘上，
+# 启动时不用像单文件版本那样每次把整个包（含 base_library.zip）解压到临时目录；--onefile 仍可生成单文件 exe。
+# 两种布局都不开 UPX，压缩过的 DLL 每次加载都要先解压。
+# 排除列表依据旧版单文件构建的 warn-tetris.txt / xref-tetris.html（源代码及构成/build/tetris/）整理：
+# numpy 只是 pygame.surfarray/sndarray 的可选依赖（游戏本身不用，batch_sim 是开发工具），
+# setuptools/pkg_resources 及其 vendored 包、unittest/pydoc/pdb 等开发用模块都是被间接带进来的；
+# 排除 pkg_resources 和 multiprocessing 后，对应的 pyi_rth_pkgres / pyi_rth_multiprocessing
+# 运行时钩子也不再在每次启动时执行。改动排除列表后用 startup.py 对照启动时间
+#
+#   pyinstaller tetris.spec                  # onedir，运行 dist/马娘消消乐/马娘消消乐
+#   pyinstaller tetris.spec -- --onefile     # 单文件 dist/马娘消消乐.exe
+#   python startup.py --exe dist/马娘消消乐/马娘消消乐
+
+import argparse
+import os
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--onefile', action='store_true', help='生成单文件可执行程序（启动较慢）')
+options = parser.parse_args()
+
+NAME = '马娘消消乐'
+ASSET_DIR = os.path.join(SPECPATH, '源代码及构成')  # 美术、音乐和图标所在目录，打包时缺一不可
+ASSETS = ('background.jpg', 'bg_music.mp3', 'icon.ico')
+EXCLUDES = [
+    # pygame 的可选依赖
+    'numpy', 'OpenGL', 'pygame.tests', 'pygame.examples', 'pygame.docs',
+    # 打包工具链及其 vendored 包
+    'setuptools', 'pkg_resources', 'distutils', '_distutils_hack', 'wheel', 'packaging', 'jaraco',
+    'more_itertools', 'importlib_metadata', 'importlib_resources', 'zipp', 'platformdirs', 'tomli',
+    'backports', 'typing_extensions', 'trove_classifiers', 'psutil', 'yaml', 'threadpoolctl',
+    # 开发、调试和网络相关的标准库（session 服务器、进程池评估等工具不打进游戏）
+    'unittest', 'doctest', 'pydoc', 'pydoc_data', 'pdb', 'tkinter', 'curses', 'readline',
+    'xmlrpc', 'xml', 'http', 'ssl', 'asyncio', 'multiprocessing', 'webbrowser',
+]
+
+missing = [name for name in ASSETS if not os.path.exists(os.path.join(ASSET_DIR, name))]
+if missing:
+    raise SystemExit(f'缺少资源文件（应放在 {ASSET_DIR}）: {", ".join(missing)}')
+datas = [(os.path.join(ASSET_DIR, name), '.') for name in ASSETS]
+icon = [os.path.join(ASSET_DIR, 'icon.ico')]
+
+a = Analysis(
+    [os.path.join(SPECPATH, 'Games.py')],
+    pathex=[SPECPATH],
+    datas=datas,
+    excludes=EXCLUDES,
+)
+pyz = PYZ(a.pure)
+
+if options.onefile:
+    exe = EXE(pyz, a.scripts, a.binaries, a.datas, [], name=NAME, icon=icon, console=False, upx=False)
+else:
+    exe = EXE(pyz, a.scripts, [], exclude_binaries=True, name=NAME, icon=icon, console=False, upx=False)
+    coll = COLLECT(exe, a.binaries, a.datas, name=NAME, upx=False)
@@ -0,0 +1,198 @@
+import argparse
+import os
+import sys
+from collections import OrderedDict
+
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window, get_drivers
+
+from profiler import OVERLAY, FLIP
+from renderer import LayeredRenderer, LOGICAL_SIZE, SHAPE_CACHE_SIZE, shape_sprite
+
+# 纹理渲染后端：与 LayeredRenderer 共用布局、镜头和全部界面绘制代码，只替换绘制原语。
+# 静态层、文字、按钮图、遮罩等表面第一次使用时上传为纹理并按表面对象缓存，之后每帧只做渲染器端的拷贝和混合；
+# 方块用渲染器的 fill_rect 填充，已固定方块层在棋盘变化或镜头移动时重新画到一张目标纹理上。
+# 每帧先合成到 300x600 的目标纹理，再由渲染器缩放拷贝到窗口中的 game_area_rect（与软件后端一样只缩放一次）。
+# 圆角、描边等其他形状先画成小精灵图（renderer.shape_sprite）再上传；带透明度的形状两个后端都按 alpha 混合。
+# 不依赖显卡：指定 SDL 的 software 渲染驱动即可在没有 GPU 的机器上运行和测试。
+# python texture_renderer.py --check 用两个后端画同样的局面，比较缩放前的画面，通道差超过 MAX_CHANNEL_DIFF 时失败
+# （缩放时 SDL 按像素中心取样、pygame.transform.scale 按像素左上角取样，非整数倍缩放的结果本来就不逐像素相同）
+
+TEXTURE_CACHE_SIZE = 256
+MAX_CHANNEL_DIFF = 8  # 两个后端同一局面的最大通道差上限（文字、遮罩混合的舍入误差），超过即判为不一致
+CLEAR = (0, 0, 0, 0)
+BLACK = (0, 0, 0, 255)
+
+
+class TextureRenderer(LayeredRenderer):
+    def __init__(self, game, driver=None):
+        super().__init__(game, dirty_rects=False)
+        self.driver = driver
+        self.window = None
+        self.sdl = None
+        self.frame = None          # 300x600 的合成目标
+        self.board_texture = None  # 已固定方块层
+        self.textures = OrderedDict()  # 表面 -> 纹理
+        self.shapes = OrderedDict()    # (尺寸, 颜色, 线宽, 圆角) -> 纹理
+        self.overlay_surface = None
+        self.overlay_texture = None
+
+    def open_window(self, size):
+        index = -1
+        if self.driver is not None:
+            names = [info.name for info in get_drivers()]
+            if self.driver not in names:
+                raise ValueError(f'SDL 渲染驱动 {self.driver} 不可用，可选: {", ".join(names)}')
+            index = names.index(self.driver)
+        self.window = Window('马娘消消乐', size, resizable=True)
+        self.sdl = Renderer(self.window, index=index, vsync=False)
+        self.frame = self.target_texture()
+        self.board_texture = self.target_texture()
+
+    def target_texture(self):
+        texture = Texture(self.sdl, LOGICAL_SIZE, target=True)
+        texture.blend_mode = pygame.BLENDMODE_BLEND
+        return texture
+
+    def resize(self, size):
+        self.window.size = size
+
+    def window_size(self):
+        return self.window.size
+
+    def layout(self, screen_size):
+        # 缩放由渲染器在拷贝时完成，不需要软件后端的缩放缓冲；窗口变化后目标纹理可能被驱动重置，重画方块层
+        super().layout(screen_size)
+        self.scaled_frame = None
+        self.board_key = None
+
+    def render(self):
+        if self.window_size() != self.screen_size:
+            self.layout(self.window_size())
+        self.update_camera()
+        self.compose()
+        self.sdl.present()
+        self.game.profiler.mark(FLIP)
+
+    def frame_surface(self):
+        sdl = self.sdl
+        sdl.target = self.frame
+        logical = sdl.to_surface(pygame.Surface(LOGICAL_SIZE, pygame.SRCALPHA))  # 默认格式会丢掉 alpha
+        sdl.target = None
+        frame = pygame.Surface(LOGICAL_SIZE)
+        frame.blit(logical, (0, 0))
+        return frame
+
+    def compose(self):
+        game = self.game
+        sdl = self.sdl
+        sdl.target = self.frame
+        self.draw_layers()
+        sdl.target = None
+        sdl.draw_color = BLACK
+        sdl.clear()
+        self.frame.draw(dstrect=game.game_area_rect)
+        profiler = game.profiler
+        profiler.mark(FLIP)
+        if profiler.overlay:
+            overlay = self.get_profiler_overlay()
+            if overlay is not self.overlay_surface:
+                # 统计面板每隔几帧重建一次，只保留一张纹理
+                self.overlay_surface = overlay
+                self.overlay_texture = Texture.from_surface(sdl, overlay)
+            self.overlay_texture.draw(dstrect=overlay.get_rect())
+            profiler.mark(OVERLAY)
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is not None:
+            self.textures.move_to_end(surface)
+            return texture
+        texture = self.textures[surface] = Texture.from_surface(self.sdl, surface)
+        if len(self.textures) > TEXTURE_CACHE_SIZE:
+            self.textures.popitem(last=False)
+        return texture
+
+    def shape(self, size, color, width, border_radius):
+        key = (size, tuple(color), width, border_radius)
+        texture = self.shapes.get(key)
+        if texture is not None:
+            self.shapes.move_to_end(key)
+            return texture
+        texture = self.shapes[key] = Texture.from_surface(self.sdl, shape_sprite(size, color, width, border_radius))
+        texture.blend_mode = pygame.BLENDMODE_BLEND
+        if len(self.shapes) > SHAPE_CACHE_SIZE:
+            self.shapes.popitem(last=False)
+        return texture
+
+    # 绘制原语（纹理后端：画在渲染器当前的目标纹理上）
+    def blit(self, surface, dest):
+        width, height = surface.get_size()
+        self.texture(surface).draw(dstrect=(dest[0], dest[1], width, height))
+
+    def draw_rect(self, color, rect, width=0, border_radius=0):
+        rect = pygame.Rect(rect)
+        if width == 0 and border_radius == 0 and len(color) == 3:
+            self.sdl.draw_color = (*color, 255)
+            self.sdl.fill_rect(rect)
+        elif rect.width > 0 and rect.height > 0:
+            self.shape(rect.size, color, width, border_radius).draw(dstrect=rect)
+
+    def draw_background(self):
+        self.sdl.draw_color = CLEAR
+        self.sdl.clear()
+        static = self.texture(self.get_static_layer())
+        static.blend_mode = pygame.BLENDMODE_NONE
+        static.draw()
+
+    def draw_board_layer(self):
+        key = self.board_layer_key()
+        if self.board_key != key:
+            sdl = self.sdl
+            sdl.target = self.board_texture
+            sdl.draw_color = CLEAR
+            sdl.clear()
+            self.draw_board()
+            sdl.target = self.frame
+            self.board_key = key
+        self.board_texture.draw()
+
+
+def differential_check(driver='software', steps=300, seed=7):
+    # 两个后端依次画开始菜单、游戏中、暂停、结束四个局面，返回 {局面: (最大通道差, 平均通道差)}
+    from Games import TetrisGame
+    games = [TetrisGame(render_backend=backend, render_driver=driver if backend == 'texture' else None)
+             for backend in ('surface', 'texture')]
+    for game in games:
+        game.assets.wait()
+    results = {}
+    for state in ('start_menu', 'playing', 'paused', 'game_over'):
+        frames = []
+        for game in games:
+            if state == 'playing':
+                game.engine.reset(seed)
+                game.game_state = 'playing'
+                game.spawn_new_piece()
+                for i in range(steps):
+                    game.engine.step(['hard_drop'] if i % 7 == 0 else ['left', 'rotate'][i % 2:], 1 / 60)
+            game.game_state = state
+            game.render()
+            frames.append(pygame.image.tobytes(game.renderer.frame_surface(), 'RGB'))
+        diffs = [abs(a - b) for a, b in zip(*frames)]
+        results[state] = (max(diffs), sum(diffs) / len(diffs))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='纹理渲染后端')
+    parser.add_argument('--check', action='store_true', help='与软件后端比较画面')
+    parser.add_argument('--driver', default='software', help='SDL 渲染驱动')
+    args = parser.parse_args()
+    if args.check:
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        results = differential_check(args.driver)
+        for state, (worst, mean) in results.items():
+            print(f'{state:12s} 最大通道差 {worst:3d}  平均通道差 {mean:.3f}')
+        if max(worst for worst, _ in results.values()) > MAX_CHANNEL_DIFF:
+            print(f'两个后端的画面差别超过 {MAX_CHANNEL_DIFF} 个色阶')
+            sys.exit(1)
@@ -0,0 +1,56 @@
+import pygame
+from collections import OrderedDict, namedtuple
+
+from assets import display_format
+
+# 按钮控件：渐变底色、边框和文字预先合成为一张精灵图，按 (尺寸, 样式, 文字, 字体) 缓存，
+# 每帧只需一次 blit；状态变化（如音乐开/关）或缩放变化时键不同，自动生成新图
+
+ButtonStyle = namedtuple('ButtonStyle', [
+    'color_start', 'color_end',  # 垂直渐变的起止颜色
+    'alpha',                     # 渐变透明度
+    'border_color', 'border_width', 'border_radius',
+    'text_color',
+])
+
+
+def render_gradient(size, color_start, color_end, alpha):
+    # 先生成 1 像素宽的渐变列，再横向拉伸，代替逐行 draw.line
+    width, height = size
+    column = pygame.Surface((1, height), pygame.SRCALPHA)
+    for y in range(height):
+        ratio = y / height
+        column.set_at((0, y), (int(color_start[0] + ratio * (color_end[0] - color_start[0])),
+                               int(color_start[1] + ratio * (color_end[1] - color_start[1])),
+                               int(color_start[2] + ratio * (color_end[2] - color_start[2])),
+                               alpha))
+    return pygame.transform.scale(column, (width, height))
+
+
+def render_button(size, style, text, font):
+    sprite = render_gradient(size, style.color_start, style.color_end, style.alpha)
+    pygame.draw.rect(sprite, style.border_color, sprite.get_rect(), style.border_width,
+                     border_radius=style.border_radius)
+    label = font.render(text, True, style.text_color)
+    sprite.blit(label, label.get_rect(center=sprite.get_rect().center))
+    return display_format(sprite, alpha=True)
+
+
+class ButtonCache:
+    def __init__(self, get_font, max_size=32):
+        self.get_font = get_font  # (字体名, 字号) -> pygame.font.Font，仅在缓存未命中时调用
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+
+    def get(self, size, style, text, font_spec):
+        key = (size, style, text, font_spec)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        sprite = render_button(size, style, text, self.get_font(*font_spec))
+        self.sprites[key] = sprite
+        # 超出容量时淘汰最久未使用的按钮图
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite